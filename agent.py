@@ -3,30 +3,40 @@ ExamBuilder LangGraph Agent - Proper Implementation
 A properly structured LangGraph agent for exam management system
 """
 
+import asyncio
+import contextvars
+import difflib
+import functools
 import json
+import orjson
 import os
-from typing import Dict, List, Optional, Any, TypedDict, Annotated
-from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
+import re
+import time
+import uuid
+from types import MappingProxyType
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, AsyncIterator, Tuple, TypedDict, Annotated
+from langchain_core.messages import HumanMessage, AIMessage, BaseMessage, RemoveMessage, SystemMessage
 from langchain_core.language_models.base import BaseLanguageModel
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_google_vertexai import ChatVertexAI
-from langgraph.graph import StateGraph, END, START
+from langchain_core.runnables import RunnableLambda
+from langchain_core.caches import InMemoryCache
+from langchain_core.globals import set_llm_cache
+from langgraph.config import get_stream_writer
 from langgraph.graph.message import add_messages
-from langgraph.prebuilt import ToolNode
-from langgraph.checkpoint.memory import MemorySaver
 from dotenv import load_dotenv
 from tool_registry import get_tool_registry
-from config import get_config
+import exambuilder_tools
+from config import get_config, get_logger
+from cache import AsyncSingleFlight, SingleFlight, TTLCache
 import langsmith
 from langsmith import trace
-import google.generativeai as genai
 
 # Load environment variables
 load_dotenv()
 
 # Get configuration
 config = get_config()
+logger = get_logger()
 
 # Setup LangSmith tracing
 os.environ["LANGCHAIN_TRACING_V2"] = "true"
@@ -45,13 +55,24 @@ class VertexAIGemini(BaseLanguageModel):
         self.temperature = temperature
         self.max_tokens = max_tokens
         
+        import google.generativeai as genai
+        
         # Configure with CLI authentication (no API key needed)
         # Uses application default credentials from gcloud auth
         genai.configure()
         self.client = genai.GenerativeModel(model_name=model)
     
-    def invoke(self, prompt: str) -> AIMessage:
+    @staticmethod
+    def _prompt_text(prompt) -> str:
+        """Flatten a message list into the single text prompt Gemini receives"""
+        if isinstance(prompt, str):
+            return prompt
+        return "\n".join(message.content for message in prompt)
+    
+    def invoke(self, prompt) -> AIMessage:
         """Generate content using Gemini model"""
+        import google.generativeai as genai
+        
         try:
             # Configure generation parameters
             generation_config = genai.types.GenerationConfig(
@@ -61,7 +82,7 @@ class VertexAIGemini(BaseLanguageModel):
             
             # Generate content
             response = self.client.generate_content(
-                contents=prompt,
+                contents=self._prompt_text(prompt),
                 generation_config=generation_config
             )
             
@@ -72,12 +93,49 @@ class VertexAIGemini(BaseLanguageModel):
             print(f"VertexAI Gemini error: {e}")
             return AIMessage(content="I apologize, but I'm having trouble processing your request right now.")
     
+    async def ainvoke(self, prompt) -> AIMessage:
+        """Generate content using Gemini model without blocking the event loop"""
+        import google.generativeai as genai
+        
+        try:
+            generation_config = genai.types.GenerationConfig(
+                temperature=self.temperature,
+                max_output_tokens=self.max_tokens
+            )
+            
+            response = await self.client.generate_content_async(
+                contents=self._prompt_text(prompt),
+                generation_config=generation_config
+            )
+            
+            return AIMessage(content=response.text)
+            
+        except Exception as e:
+            print(f"VertexAI Gemini error: {e}")
+            return AIMessage(content="I apologize, but I'm having trouble processing your request right now.")
+    
     @property
     def _llm_type(self) -> str:
         return "vertexai_gemini"
 
+# With temperature 0 a repeated prompt (e.g. the same opening message in a new
+# session) gets the same answer, so chat models return it from memory
+LLM_CACHE_SIZE = 1000
+if config.LLM_TEMPERATURE == 0:
+    set_llm_cache(InMemoryCache(maxsize=LLM_CACHE_SIZE))
+
+# Connections the OpenAI client keeps to the API; concurrent turns multiplex
+# over them instead of each opening its own
+LLM_MAX_CONNECTIONS = 100
+LLM_MAX_KEEPALIVE_CONNECTIONS = 50
+
+@functools.cache
 def get_llm():
-    """Get the appropriate LLM based on configuration"""
+    """Get the appropriate LLM based on configuration (created once and reused)
+
+    Provider packages are imported here, so only the configured one is loaded
+    and importing the agent stays fast.
+    """
     if config.LLM_PROVIDER == "vertexai":
         return VertexAIGemini(
             model=config.LLM_MODEL,
@@ -85,34 +143,91 @@ def get_llm():
             max_tokens=config.LLM_MAX_TOKENS
         )
     elif config.LLM_PROVIDER == "gemini":
+        from langchain_google_vertexai import ChatVertexAI
+        
         return ChatVertexAI(
             model=config.LLM_MODEL,
             temperature=config.LLM_TEMPERATURE,
             max_tokens=config.LLM_MAX_TOKENS
         )
     else:  # Default to OpenAI
+        import httpx
+        from langchain_openai import ChatOpenAI
+        
+        # Every prompt asks for a JSON object, so have the API guarantee one
         return ChatOpenAI(
             model=config.LLM_MODEL,
             temperature=config.LLM_TEMPERATURE,
             openai_api_key=config.OPENAI_API_KEY,
-            max_tokens=config.LLM_MAX_TOKENS
+            max_tokens=config.LLM_MAX_TOKENS,
+            model_kwargs={"response_format": {"type": "json_object"}},
+            # Kept for the life of the process, so it needs a pool per event loop
+            http_async_client=httpx.AsyncClient(transport=_llm_transport())
+        )
+
+@functools.cache
+def _llm_transport():
+    """Get the connection pools of the OpenAI async client"""
+    import httpx
+    from exambuilder_tools import HTTP2_ENABLED, LoopLocalTransport
+    
+    return LoopLocalTransport(
+        http2=HTTP2_ENABLED,
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS
         )
+    )
+
+async def aclose_llm_client():
+    """Close the running event loop's pooled OpenAI connections; the client stays usable"""
+    if _llm_transport.cache_info().currsize:
+        await _llm_transport().aclose()
+
+@functools.cache
+def get_prompt_llm(prompt_name: str):
+    """Get the LLM for one kind of prompt, tagged so OpenAI serves it from a warm prompt cache
+
+    OpenAI routes requests with the same prompt_cache_key to the same servers,
+    where the unchanged system message prefix is already cached. Prompts with
+    a response schema get replies that are guaranteed to match it.
+    """
+    llm = get_llm()
+    if config.LLM_PROVIDER in ("vertexai", "gemini"):
+        return llm
+    
+    response_format = PROMPT_RESPONSE_FORMATS.get(prompt_name) if config.LLM_STRUCTURED_OUTPUT else None
+    if response_format is None:
+        return llm.bind(prompt_cache_key=f"exambuilder-{prompt_name}")
+    return llm.bind(prompt_cache_key=f"exambuilder-{prompt_name}", response_format=response_format)
 
 # ============================================================================
 # STATE DEFINITION
 # ============================================================================
 
+# Conversation lines kept as prompt context for the classifier and extractor
+CONTEXT_LINES = 6
+
+def append_context_lines(left: Optional[List[str]], right: Optional[List[str]]) -> List[str]:
+    """Reducer keeping only the latest CONTEXT_LINES rendered conversation lines"""
+    return ((left or []) + (right or []))[-CONTEXT_LINES:]
+
 class AgentState(TypedDict):
     """The state of our LangGraph agent"""
     messages: Annotated[List[BaseMessage], add_messages]
     instructor_id: Optional[str]
     user_id: Optional[str]
     exam_data: Optional[List[Dict]]
+    exam_data_ts: Optional[float]
     user_exam_id: Optional[str]
     extracted_entities: Optional[Dict]
     current_intent: Optional[str]
     missing_info: Optional[List[str]]
     context: Optional[Dict]
+    fast_path: Optional[bool]
+    new_entities: Optional[Dict]  # Extracted by the classifier this turn, merged by the entity extractor
+    tool_results: Optional[Dict]  # Read-only tool results reused within the session, see session_tool_call
+    context_lines: Annotated[List[str], append_context_lines]  # Rendered as each message is added
 
 # ============================================================================
 # LANGGRAPH TOOLS INTEGRATION
@@ -155,62 +270,448 @@ def create_langgraph_tools():
     
     return tools
 
+def report_progress(text: str):
+    """Show a streaming client what a node is doing while it is still running"""
+    try:
+        get_stream_writer()({"progress": text})
+    except RuntimeError:
+        pass  # Called outside a graph run, e.g. from a prefetch thread
+
 # ============================================================================
-# LANGGRAPH NODES
+# EXAM LIST CACHE
+# ============================================================================
+
+# Most intents look up the instructor's exam list, which rarely changes,
+# so reuse a recent response instead of calling the API on every turn
+_exam_cache = TTLCache(ttl=config.EXAM_CACHE_TTL_SECONDS)
+
+# Background fetches started ahead of the turn that is likely to need them
+_prefetch_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="exam-prefetch")
+_exam_prefetches: Dict[str, tuple] = {}  # instructor_id -> (started_at, Future)
+PREFETCH_MAX_AGE_SECONDS = 60
+
+def get_cached_exams(instructor_id: str) -> Dict:
+    """Get the instructor's exam list, reusing a recent response when available"""
+    cached = _exam_cache.get(instructor_id)
+    if cached is not None:
+        print(f"⚡ Using cached exam list for instructor {instructor_id}")
+        return cached
+    
+    # Wait for an in-flight prefetch rather than issuing a duplicate request
+    prefetch = _exam_prefetches.pop(instructor_id, None)
+    if prefetch is not None:
+        started_at, future = prefetch
+        if time.monotonic() - started_at < PREFETCH_MAX_AGE_SECONDS:
+            try:
+                return future.result(timeout=PREFETCH_MAX_AGE_SECONDS)
+            except Exception as e:
+                print(f"⚠️  Exam prefetch failed, fetching again: {e}")
+    
+    return _load_exams(instructor_id)
+
+def _load_exams(instructor_id: str) -> Dict:
+    """Fetch the exam list from the API and cache successful responses"""
+    tool_registry = get_tool_registry()
+    result = tool_registry.execute_tool("list_exams", instructor_id=instructor_id)
+    
+    # Only cache successful API responses
+    if result.get("status") and "error" not in result.get("data", {}):
+        _exam_cache.set(instructor_id, result)
+        _exam_name_index.pop(instructor_id)
+    
+    return result
+
+def prefetch_exams(instructor_id: str):
+    """Start loading the exam list in the background if it isn't cached yet"""
+    if instructor_id in _exam_cache:
+        return
+    
+    prefetch = _exam_prefetches.get(instructor_id)
+    if prefetch is not None and not prefetch[1].done():
+        return
+    
+    future: Future = _prefetch_pool.submit(_load_exams, instructor_id)
+    _exam_prefetches[instructor_id] = (time.monotonic(), future)
+
+# Lowercased exam name -> exam, built once per exam list instead of
+# scanning the whole list for every name lookup
+_exam_name_index = TTLCache(ttl=config.EXAM_CACHE_TTL_SECONDS)
+
+# Minimum similarity (difflib ratio) for a misspelled exam name to match
+EXAM_NAME_MATCH_CUTOFF = 0.8
+
+# Tokens that tell otherwise identical exam names apart ("Math 101", "Unit 3
+# Quiz", "Final Exam B"); a misspelling never changes them
+_EXAM_LABEL_RE = re.compile(r"\w*\d\w*|\b\w{1,2}\b")
+
+def exam_name_index(instructor_id: str, exam_data: List[Dict]) -> Dict[str, Dict]:
+    """Get the instructor's exams by lowercased name"""
+    index = _exam_name_index.get(instructor_id)
+    if index is None:
+        index = {}
+        for exam in exam_data:
+            name = exam.get("EXAMNAME")
+            if name:
+                index.setdefault(name.lower(), exam)
+        _exam_name_index.set(instructor_id, index)
+    return index
+
+def find_exam(instructor_id: str, exam_data: List[Dict], exam_name: Optional[str]) -> Optional[Dict]:
+    """Find an exam by name (case-insensitive) in the instructor's exam list"""
+    if not exam_name:
+        return None
+    return exam_name_index(instructor_id, exam_data).get(exam_name.lower())
+
+def find_similar_exam(instructor_id: str, exam_data: List[Dict], exam_name: Optional[str]) -> Optional[Dict]:
+    """Find the exam a misspelled name most likely means, never one with different numbers or labels"""
+    if not exam_name:
+        return None
+    
+    name = exam_name.lower()
+    labels = _EXAM_LABEL_RE.findall(name)
+    index = exam_name_index(instructor_id, exam_data)
+    candidates = [candidate for candidate in index if _EXAM_LABEL_RE.findall(candidate) == labels]
+    close_names = difflib.get_close_matches(name, candidates, n=1, cutoff=EXAM_NAME_MATCH_CUTOFF)
+    return index[close_names[0]] if close_names else None
+
+# How long a session keeps reusing the exam list it already fetched
+SESSION_EXAM_DATA_TTL_SECONDS = 60
+
+def fetch_exams(state: AgentState, instructor_id: str) -> Optional[List[Dict]]:
+    """Get the exam list once per session and share it across all intents"""
+    exam_data = state.get("exam_data")
+    # Wall-clock time, since the timestamp is checkpointed and may be read on
+    # another host; a timestamp from the future counts as stale
+    fetched_at = state.get("exam_data_ts") or 0.0
+    if exam_data is not None and 0 <= time.time() - fetched_at < SESSION_EXAM_DATA_TTL_SECONDS:
+        return exam_data
+    
+    if instructor_id not in _exam_cache:
+        report_progress("📚 Loading the exam list...")
+    result = get_cached_exams(instructor_id)
+    if not result.get("status") or "error" in result.get("data", {}):
+        return None
+    
+    exam_data = result.get("data", {}).get("exams", [])
+    state["exam_data"] = exam_data
+    state["exam_data_ts"] = time.time()
+    return exam_data
+
+# ============================================================================
+# STUDENT LOOKUP CACHE
 # ============================================================================
 
-def intent_classifier_node(state: AgentState) -> AgentState:
-    """Classify user intent from the latest message"""
+# Student ID -> user ID, keyed by instructor so every session of that
+# instructor reuses the lookup instead of searching the student list again
+_user_id_cache = TTLCache(ttl=config.USER_ID_CACHE_TTL_SECONDS, maxsize=1000)
+
+# Student lookups started while the LLM is still reading the message
+_student_prefetches: Dict[tuple, tuple] = {}  # (instructor_id, student_id) -> (started_at, Future)
+
+def resolve_user_id(instructor_id: str, student_id: str) -> Optional[str]:
+    """Get a student's user ID, or None if the student was not found"""
+    key = (instructor_id, student_id.lower())
+    prefetch = _student_prefetches.pop(key, None)
+    user_id = _user_id_cache.get(key)
+    if user_id is not None:
+        print(f"⚡ Using cached user ID for {student_id}")
+        return user_id
+    
+    # Wait for an in-flight prefetch rather than searching again. A miss is
+    # searched again, since the student may have been created since.
+    if prefetch is not None:
+        started_at, future = prefetch
+        if time.monotonic() - started_at < PREFETCH_MAX_AGE_SECONDS:
+            try:
+                user_id = future.result(timeout=PREFETCH_MAX_AGE_SECONDS)
+                if user_id is not None:
+                    return user_id
+            except Exception as e:
+                print(f"⚠️  Student prefetch failed, searching again: {e}")
+    
+    return _search_user_id(instructor_id, student_id)
+
+def _search_user_id(instructor_id: str, student_id: str) -> Optional[str]:
+    """Search the student list for a student's user ID, caching it when found"""
+    key = (instructor_id, student_id.lower())
+    report_progress("🔎 Looking up the student...")
+    tool_registry = get_tool_registry()
+    result = tool_registry.execute_tool(
+        "search_student_by_student_id",
+        instructor_id=instructor_id,
+        student_id=student_id
+    )
     
-    llm = get_llm()
+    # Misses are not cached: the student may be created in the next turn
+    data = result.get("data", {})
+    if not result.get("status") or not data.get("found"):
+        return None
     
-    # Get the latest human message
-    latest_message = None
-    for msg in reversed(state["messages"]):
-        if isinstance(msg, HumanMessage):
-            latest_message = msg.content
-            break
+    user_id = data.get("user_id")
+    if user_id is not None:
+        _user_id_cache.set(key, user_id)
+    return user_id
+
+def prefetch_student(instructor_id: str, student_id: str):
+    """Start looking up a student's user ID in the background if it isn't cached yet"""
+    key = (instructor_id, student_id.lower())
+    if key in _user_id_cache:
+        return
     
-    if not latest_message:
-        return state
+    prefetch = _student_prefetches.get(key)
+    if prefetch is not None and not prefetch[1].done():
+        return
     
-    # Check if we have a previous intent and missing info (context continuation)
-    previous_intent = state.get("current_intent")
-    missing_info = state.get("missing_info", [])
+    # Drop prefetches no turn picked up, e.g. when the intent didn't need the student
+    now = time.monotonic()
+    for stale_key, (started_at, _) in list(_student_prefetches.items()):
+        if now - started_at > PREFETCH_MAX_AGE_SECONDS:
+            _student_prefetches.pop(stale_key, None)
     
-    # If we have missing info and user provides simple input, maintain context
-    if previous_intent and missing_info:
-        # Simple inputs that are likely continuation of previous intent
-        simple_patterns = [
-            len(latest_message.split()) <= 3,  # 3 words or less
-            latest_message.lower().startswith(("my ", "i am ", "john", "doe", "password")),
-            any(word in latest_message.lower() for word in ["john", "doe", "password", "email", "@"]),
-            latest_message.replace(" ", "").replace(",", "").replace(".", "").isalnum()  # Simple alphanumeric
-        ]
-        
-        if any(simple_patterns):
-            print(f"🔄 Maintaining previous intent: {previous_intent}")
-            state["current_intent"] = previous_intent
-            return state
+    future: Future = _prefetch_pool.submit(_search_user_id, instructor_id, student_id)
+    _student_prefetches[key] = (now, future)
+
+# Concurrent create_student requests for the same account
+_create_student_calls = SingleFlight()
+
+# Most API calls one fan-out has in flight at once, so a student with many
+# exams doesn't trip the API's rate limits
+TOOL_CALL_CONCURRENCY = 8
+
+# Runs independent tool calls of a single turn concurrently
+_tool_pool = ThreadPoolExecutor(max_workers=TOOL_CALL_CONCURRENCY, thread_name_prefix="tool-call")
+
+def submit_tool_call(func, *args, **kwargs) -> Future:
+    """Start a lookup on the tool pool, keeping the caller's stream writer for progress updates"""
+    return _tool_pool.submit(contextvars.copy_context().run, func, *args, **kwargs)
+
+# ============================================================================
+# SESSION TOOL RESULTS
+# ============================================================================
+
+# How long a session reuses a read-only tool result it already fetched, so
+# follow-up questions about the same student don't repeat the same API calls
+SESSION_TOOL_RESULT_TTL_SECONDS = 60
+
+# Read-only tools whose results are not already cached in exambuilder_tools
+SESSION_CACHED_TOOLS = frozenset({
+    "list_scheduled_exams",
+    "get_exam_attempt",
+    "get_student_exam_statistics"
+})
+
+def fresh_tool_results(state: AgentState) -> Dict[str, list]:
+    """Copy the session's tool results that have not expired yet"""
+    # Wall-clock time, since the results are checkpointed and may be read on
+    # another host; a timestamp from the future counts as expired
+    now = time.time()
+    return {
+        key: entry for key, entry in (state.get("tool_results") or {}).items()
+        if 0 <= now - entry[0] < SESSION_TOOL_RESULT_TTL_SECONDS
+    }
+
+def tool_result_key(name: str, kwargs: Dict) -> str:
+    """Key of a tool call in the session's tool results"""
+    return f"{name}:{json.dumps(kwargs, sort_keys=True)}"
+
+def remember_tool_result(state: AgentState, name: str, key: str, result: Dict) -> Dict:
+    """Keep a read-only tool's successful, fresh result for the session, returning it"""
+    # The registry reports status True for API errors and stale fallbacks too
+    if name in SESSION_CACHED_TOOLS and result.get("status") and exambuilder_tools._is_cacheable(result.get("data")):
+        state["tool_results"][key] = [time.time(), result]
+    return result
+
+def session_tool_call(state: AgentState, name: str, **kwargs) -> Dict:
+    """Run a read-only tool, reusing this session's result for the same arguments"""
+    key = tool_result_key(name, kwargs)
+    entry = state.setdefault("tool_results", {}).get(key)
+    if entry is not None:
+        return entry[1]
+    return remember_tool_result(state, name, key, get_tool_registry().execute_tool(name, **kwargs))
+
+async def asession_tool_call(state: AgentState, name: str, **kwargs) -> Dict:
+    """Async session_tool_call, awaiting the tool over the async HTTP client where it can"""
+    key = tool_result_key(name, kwargs)
+    entry = state.setdefault("tool_results", {}).get(key)
+    if entry is not None:
+        return entry[1]
+    return remember_tool_result(state, name, key, await get_tool_registry().aexecute_tool(name, **kwargs))
+
+# Event loop running the graph asynchronously, if any. The tool node runs in a
+# worker thread; its fan-outs are awaited on this loop instead of occupying a
+# pool thread per call.
+_graph_loop: contextvars.ContextVar[Optional[asyncio.AbstractEventLoop]] = contextvars.ContextVar(
+    "graph_loop", default=None
+)
+
+def run_tool_calls(state: AgentState, calls: List[Tuple[str, Dict]]) -> List[Dict]:
+    """Run independent read-only tool calls concurrently, returning results in call order"""
+    loop = _graph_loop.get()
+    if loop is not None:
+        async def gather_calls() -> List[Dict]:
+            semaphore = asyncio.Semaphore(TOOL_CALL_CONCURRENCY)
+            
+            async def limited_call(name: str, kwargs: Dict) -> Dict:
+                async with semaphore:
+                    return await asession_tool_call(state, name, **kwargs)
+            
+            return await asyncio.gather(*(limited_call(name, kwargs) for name, kwargs in calls))
+        return asyncio.run_coroutine_threadsafe(gather_calls(), loop).result()
     
-    # Get conversation context for better classification
-    recent_messages = []
-    for msg in reversed(state["messages"][-4:]):  # Last 4 messages for context
+    return list(_tool_pool.map(lambda call: session_tool_call(state, call[0], **call[1]), calls))
+
+def invalidate_tool_results(state: AgentState, name: str):
+    """Forget the session's results of a tool after a change makes them stale"""
+    prefix = f"{name}:"
+    state["tool_results"] = {
+        key: entry for key, entry in (state.get("tool_results") or {}).items()
+        if not key.startswith(prefix)
+    }
+
+# ============================================================================
+# LANGGRAPH NODES
+# ============================================================================
+
+# Whole-message commands that can be answered without calling the LLM
+_FAST_INTENT_RE = re.compile(
+    r"\s*(?:/?(?P<command>help|status)|/\w+|what can you do)\s*[?!.]*\s*",
+    re.IGNORECASE,
+)
+
+# Unambiguous keywords for the read-only intents; a message matching exactly
+# one pattern skips the classification prompt
+INTENT_PATTERNS = MappingProxyType({
+    "get_results": re.compile(r"\b(?:results?|scores?|grades?)\b", re.IGNORECASE),
+    "list_scheduled_exams": re.compile(r"\b(?:my exams|scheduled|registered)\b", re.IGNORECASE),
+    "list_students": re.compile(r"\b(?:list|show|all)\b.*\bstudents\b", re.IGNORECASE),
+    "list_exams": re.compile(r"\b(?:list|available|all|what)\b.*\bexams\b", re.IGNORECASE),
+})
+
+# Words of the intents that change data. A keyword can't tell "register me" from
+# "don't register me" or "what's the schedule?", so these messages always go
+# through the classifier
+WRITE_INTENT_RE = re.compile(
+    r"\b(?:register|schedule|sign (?:me )?up|enrol+|create|new account|new student)\b", re.IGNORECASE
+)
+
+# Entities that can be read straight from a message; a keyword intent whose
+# required fields are all found this way skips the extraction prompt too
+ENTITY_PATTERNS = MappingProxyType({
+    "student_id": re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+"),
+})
+
+def latest_human_message(messages: List[BaseMessage]) -> Optional[str]:
+    """Get the content of the most recent human message"""
+    for msg in reversed(messages):
         if isinstance(msg, HumanMessage):
-            recent_messages.append(f"User: {msg.content}")
-        elif isinstance(msg, AIMessage):
-            recent_messages.append(f"Agent: {msg.content[:100]}...")
-    
-    context = "\n".join(reversed(recent_messages))
-    
-    prompt = f"""
-        You are an intent classifier for an exam management system.
+            return msg.content
+    return None
+
+def match_fast_intent(message: str) -> Optional[str]:
+    """Return the intent for trivial commands, or None if the LLM is needed"""
+    match = _FAST_INTENT_RE.fullmatch(message)
+    if not match:
+        return None
+    # Unknown slash commands fall back to help
+    return (match.group("command") or "help").lower()
+
+# Simple inputs that are likely a continuation of the previous intent:
+# answers that mention a field, and plain alphanumeric text
+_CONTINUATION_RE = re.compile(r"^(?:my |i am )|john|doe|password|email|@", re.IGNORECASE)
+_PLAIN_TEXT_RE = re.compile(r"[ ,.]*(?:[^\W_][ ,.]*)+")
+
+def is_simple_continuation(message: str) -> bool:
+    """Whether a message likely answers the previous question rather than starting a new request"""
+    return (
+        len(message.split()) <= 3  # 3 words or less
+        or _CONTINUATION_RE.search(message) is not None
+        or _PLAIN_TEXT_RE.fullmatch(message) is not None
+    )
 
-        User input: "{latest_message}"
-        Previous intent: {previous_intent}
+def match_keyword_intent(message: str) -> Optional[str]:
+    """Return the read-only intent when exactly one keyword pattern matches, or None if the LLM is needed"""
+    if WRITE_INTENT_RE.search(message):
+        return None
+    matches = [intent for intent, pattern in INTENT_PATTERNS.items() if pattern.search(message)]
+    return matches[0] if len(matches) == 1 else None
 
-        Recent conversation context:
-        {context}
+def speculate_lookups(state: AgentState, message: str):
+    """Start the API lookups a message with a student ID will likely need while the LLM reads it"""
+    instructor_id = state.get("instructor_id")
+    match = ENTITY_PATTERNS["student_id"].search(message)
+    if not instructor_id or match is None:
+        return
+    
+    prefetch_student(instructor_id, match.group())
+    prefetch_exams(instructor_id)
+
+def match_keyword_entities(intent: str, message: str) -> Optional[Dict[str, str]]:
+    """Read an intent's required fields from the message, or None if the LLM must extract them"""
+    entities = {}
+    for field in REQUIRED_FIELDS.get(intent, ()):
+        pattern = ENTITY_PATTERNS.get(field)
+        match = pattern.search(message) if pattern else None
+        if not match:
+            return None
+        entities[field] = match.group()
+    return entities
+
+def user_context_line(content: str) -> str:
+    """Render a user message as a line of prompt context"""
+    return f"User: {content}"
+
+def agent_context_line(content: str) -> str:
+    """Render an agent reply as a line of prompt context, truncated"""
+    return f"Agent: {content[:100]}..."
+
+def recent_conversation(state: AgentState) -> str:
+    """Join the rolling buffer of recent conversation lines, oldest first"""
+    return "\n".join(state.get("context_lines") or [])
+
+def turn_input(user_input: str) -> Dict[str, Any]:
+    """Graph input for one user turn, recording it in the context buffer"""
+    return {"messages": [HumanMessage(content=user_input)], "context_lines": [user_context_line(user_input)]}
+
+# Entity instructions shared by the combined classification prompt and the
+# follow-up extraction prompt
+ENTITY_EXTRACTION_RULES = """
+        CONTEXT ANALYSIS:
+        - If intent is "create_student" and missing first_name: extract single word/name as first_name (e.g., "Tim" → first_name:"Tim")
+        - If intent is "create_student" and missing last_name: extract single word/name as last_name (e.g., "David" → last_name:"David")  
+        - If intent is "create_student" and missing student_id: extract any string as student_id (e.g., "Tim1212" → student_id:"Tim1212")
+        - If intent is "create_student" and missing password: extract any input as password
+        - For simple single-word inputs, map to the FIRST missing field in this order: first_name, last_name, student_id, password
+        - Simple inputs in create_student context should be mapped to missing fields
+
+        Extract ONLY the following entities if present:
+        - student_id: Any student identifier including email addresses, usernames, or IDs (like "SAMPLE+2523350510825", "john@example.com", "john123")
+        - exam_id: Exam IDs (usually alphanumeric strings)
+        - exam_name: Exam names (like "Serengeti Certification", "Pearson Test 1", "Serengeti Practice Exam")
+        - first_name: First names
+        - last_name: Last names
+        - password: Passwords
+
+        IMPORTANT RULES:
+        1. If the user mentions "Serengetic" they likely mean "Serengeti"
+        2. Extract email addresses as student_id (emails are valid student IDs)
+        3. For exam names, check for partial matches (e.g., "Serengetic" → "Serengeti Certification")
+        4. Preserve previously extracted entities if they're still relevant
+        5. If user says "my student ID is X" or "my email is X", extract X as student_id
+        6. If user mentions an exam name, extract it even if spelled slightly wrong
+        7. Parse comma-separated values: "John, Doe, password123" = first_name:"John", last_name:"Doe", password:"password123"
+        8. Look for patterns like "John Doe" for first and last names
+        9. For create_student intent: if user gives simple input, map to the missing field (single word usually goes to the currently missing field)
+        10. Extract "Tim" as first_name, "David" as last_name, "Tim1212" as student_id, "MyPass123" as password based on context
+        11. When user provides an email address, always extract it as student_id, not as a separate email field
+        12. Pattern matching: "my [field] is X" should extract X as that field
+"""
+
+# The instructions are sent first as a system message that is identical on
+# every call, so the provider can cache that prefix; only the short per-turn
+# details that follow in the human message change. Keep that order, and keep
+# anything that varies out of the system message, or every call misses the cache.
+INTENT_CLASSIFICATION_SYSTEM = SystemMessage(content=f"""
+        You are an intent classifier and entity extractor for an exam management system.
 
         Available intents:
         - list_exams: User wants to see available exams
@@ -224,7 +725,7 @@ def intent_classifier_node(state: AgentState) -> AgentState:
         - help: User needs help
         - status: User wants system status
 
-        IMPORTANT RULES:
+        INTENT RULES:
         1. If user is providing missing information for previous intent, keep the same intent
         2. Look for keywords: 
         - "register", "schedule" = schedule_exam
@@ -233,58 +734,313 @@ def intent_classifier_node(state: AgentState) -> AgentState:
         - "show", "my exams", "scheduled", "registered" = list_scheduled_exams
         3. If user says single words/names after create_student context, maintain create_student intent
         4. If user provides student ID after asking for registration, maintain schedule_exam intent
+        {ENTITY_EXTRACTION_RULES}
+        Respond with ONLY a JSON object holding the intent name and the found entities.
+        Example: {{"intent": "schedule_exam", "entities": {{"student_id": "john@example.com", "exam_name": "Serengeti Practice Exam"}}}}
+""")
+
+# Classifications of the opening message of a session. Nothing precedes it, so
+# the same text (ignoring spacing) always gets the same intent and entities and
+# a new session can skip the LLM call. The text keeps its case, which entities
+# like student IDs and passwords depend on.
+CLASSIFICATION_CACHE_TTL_SECONDS = 3600
+_classification_cache = TTLCache(ttl=CLASSIFICATION_CACHE_TTL_SECONDS, maxsize=1024)
+
+def classification_cache_key(state: AgentState) -> Optional[str]:
+    """Key for the classification of a session's opening message, or None for later turns"""
+    messages = state["messages"]
+    if len(messages) != 1 or state.get("current_intent"):
+        return None
+    return " ".join(latest_human_message(messages).split())
+
+# Sessions opening with the same message at the same time share one LLM call
+_classification_flights = SingleFlight()
+_aclassification_flights = AsyncSingleFlight()
+
+def copy_classification(update: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a shared classification so one session's update can't change another's"""
+    return {**update, "new_entities": dict(update["new_entities"])}
+
+def classify_with_llm(prompt: List[BaseMessage]) -> Dict[str, Any]:
+    """Classify and extract with one LLM call"""
+    response = get_prompt_llm("intent-classification").invoke(prompt)
+    return parse_intent_classification(response.content)
+
+async def aclassify_with_llm(prompt: List[BaseMessage]) -> Dict[str, Any]:
+    """Async classify_with_llm"""
+    response = await get_prompt_llm("intent-classification").ainvoke(prompt)
+    return parse_intent_classification(response.content)
+
+def plan_intent_classification(state: AgentState) -> Tuple[Optional[Dict[str, Any]], Optional[List[BaseMessage]]]:
+    """Return the node's update when no LLM call is needed, otherwise the classification messages"""
+    
+    messages = state["messages"]
+    latest_message = latest_human_message(messages)
+    if not latest_message:
+        return {}, None
+    
+    fast_intent = match_fast_intent(latest_message)
+    if fast_intent:
+        print(f"⚡ Fast-path intent: {fast_intent}")
+        return {"current_intent": fast_intent, "fast_path": True, "missing_info": [], "context": {}}, None
+    
+    # Check if we have a previous intent and missing info (context continuation)
+    previous_intent = state.get("current_intent")
+    missing_info = state.get("missing_info", [])
+    
+    # If we have missing info and user provides simple input, maintain context
+    if previous_intent and missing_info:
+        if is_simple_continuation(latest_message):
+            print(f"🔄 Maintaining previous intent: {previous_intent}")
+            # The entity extractor reads the answer in light of the missing fields
+            return {"current_intent": previous_intent, "fast_path": False, "new_entities": None}, None
+    
+    # A fresh request with an obvious keyword only needs its entities extracted
+    keyword_intent = None if missing_info else match_keyword_intent(latest_message)
+    if keyword_intent:
+        print(f"⚡ Keyword intent: {keyword_intent}")
+        # Intents without required fields have nothing to extract, and the
+        # LLM only extracts fields the patterns could not read
+        new_entities = match_keyword_entities(keyword_intent, latest_message)
+        if new_entities is None:
+            speculate_lookups(state, latest_message)
+        return {"current_intent": keyword_intent, "fast_path": False, "new_entities": new_entities}, None
+    
+    cache_key = classification_cache_key(state)
+    cached = _classification_cache.get(cache_key) if cache_key is not None else None
+    if cached is not None:
+        print(f"⚡ Cached classification: {cached['current_intent']}")
+        return copy_classification(cached), None
+    
+    speculate_lookups(state, latest_message)
+    previous_entities = state.get("extracted_entities", {})
+    context = recent_conversation(state)
+    
+    # Classify and extract in one round trip; the entity extractor then only
+    # merges and validates what came back
+    prompt = [
+        INTENT_CLASSIFICATION_SYSTEM,
+        HumanMessage(content=f"""
+        Previous intent: {previous_intent}
+        Previous entities found: {previous_entities}
+        Missing information: {missing_info}
 
-        Respond with ONLY the intent name, nothing else.
-    """
+        Recent conversation context:
+        {context}
+
+        User input: "{latest_message}"
+    """)
+    ]
+    return None, prompt
+
+# Markdown code fences some providers wrap JSON replies in, when they lack a JSON mode
+_JSON_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+def parse_llm_json(content: str) -> Any:
+    """Parse an LLM's JSON reply, ignoring any code fences around it"""
+    return orjson.loads(_JSON_FENCE_RE.sub("", content))
+
+def parse_intent_classification(content: str) -> Dict[str, Any]:
+    """Turn the classifier's JSON reply into the node's update"""
+    parsed = parse_llm_json(content)
+    intent = str(parsed.get("intent", "help")).strip().lower()
+    new_entities = parsed.get("entities") or {}
+    if not isinstance(new_entities, dict):
+        new_entities = {}
+    
+    print(f"🎯 Classified intent: {intent}")
+    return {"current_intent": intent, "fast_path": False, "new_entities": new_entities}
+
+def intent_classifier_node(state: AgentState) -> Dict[str, Any]:
+    """Classify user intent from the latest message, extracting its entities in the same LLM call"""
+    update, prompt = plan_intent_classification(state)
+    if update is not None:
+        return update
     
     try:
         with trace("intent_classification"):
-            response = llm.invoke(prompt)
-            intent = response.content.strip().lower()
+            cache_key = classification_cache_key(state)
+            if cache_key is None:
+                return classify_with_llm(prompt)
             
-        state["current_intent"] = intent
-        print(f"🎯 Classified intent: {intent}")
-        
+            update = _classification_flights.do(cache_key, classify_with_llm, prompt)
+            _classification_cache.set(cache_key, update)
+            return copy_classification(update)
     except Exception as e:
         print(f"Intent classification error: {e}")
-        state["current_intent"] = "help"
+        return {"current_intent": "help", "fast_path": False, "new_entities": {}}
+
+async def aintent_classifier_node(state: AgentState) -> Dict[str, Any]:
+    """Async intent_classifier_node, awaiting the LLM instead of holding a worker thread"""
+    update, prompt = plan_intent_classification(state)
+    if update is not None:
+        return update
     
-    return state
+    try:
+        async with trace("intent_classification"):
+            cache_key = classification_cache_key(state)
+            if cache_key is None:
+                return await aclassify_with_llm(prompt)
+            
+            update = await _aclassification_flights.do(cache_key, aclassify_with_llm, prompt)
+            _classification_cache.set(cache_key, update)
+            return copy_classification(update)
+    except Exception as e:
+        print(f"Intent classification error: {e}")
+        return {"current_intent": "help", "fast_path": False, "new_entities": {}}
+
+# Required fields for each intent
+REQUIRED_FIELDS = MappingProxyType({
+    "schedule_exam": ("student_id", "exam_name"),
+    "get_results": ("student_id", "exam_name"),
+    "create_student": ("first_name", "last_name", "student_id", "password"),
+    "list_scheduled_exams": ("student_id",)
+})
+
+def find_missing_info(intent: str, entities: Dict) -> List[str]:
+    """Validate if we have required information for the intent"""
+    missing_info = [field for field in REQUIRED_FIELDS.get(intent, ()) if not entities.get(field)]
+    print(f"✅ Validation - Missing info: {missing_info}")
+    return missing_info
 
-def entity_extractor_node(state: AgentState) -> AgentState:
-    """Extract entities from user input"""
+def merge_entities(state: AgentState, new_entities: Optional[Dict]) -> Dict[str, Any]:
+    """Merge newly extracted entities into the session's and validate them against the intent"""
+    intent = state.get("current_intent", "")
     
-    llm = get_llm()
+    # Get previous entities to maintain context
+    previous_entities = state.get("extracted_entities", {})
     
-    # Get the latest human message
-    latest_message = None
-    for msg in reversed(state["messages"]):
-        if isinstance(msg, HumanMessage):
-            latest_message = msg.content
-            break
+    if new_entities is None:
+        # Keep previous entities if there was nothing to extract or extraction failed
+        return {"missing_info": find_missing_info(intent, previous_entities)}
+    
+    # Merge with previous entities in one pass, giving priority to new ones;
+    # fields the LLM returned empty don't erase values already known
+    merged_entities = {**previous_entities, **{key: value for key, value in new_entities.items() if value}}
     
+    print(f"🔍 Extracted entities: {merged_entities}")
+    return {
+        "extracted_entities": merged_entities,
+        "missing_info": find_missing_info(intent, merged_entities),
+        "new_entities": None
+    }
+
+# Static extraction instructions, cached by the provider like INTENT_CLASSIFICATION_SYSTEM
+ENTITY_EXTRACTION_SYSTEM = SystemMessage(content=f"""
+        Extract entities from the user input.
+        {ENTITY_EXTRACTION_RULES}
+        Respond with a JSON object containing only the found entities.
+        Examples:
+        - Input "Tim" (when expecting first_name) → {{"first_name": "Tim"}}
+        - Input "David" (when expecting last_name) → {{"last_name": "David"}}
+        - Input "My last name is David" → {{"last_name": "David"}}
+        - Input "Tim1212" (when expecting student_id) → {{"student_id": "Tim1212"}}
+        - Input "JohnDoe" (when expecting password) → {{"password": "JohnDoe"}}
+""")
+
+# What each field looks like, for the extraction prompts of single intents
+ENTITY_FIELD_DESCRIPTIONS = MappingProxyType({
+    "student_id": 'Any student identifier including email addresses, usernames, or IDs (like "SAMPLE+2523350510825", "john@example.com", "john123"); an email address is always a student_id',
+    "exam_name": 'Exam names (like "Serengeti Certification", "Pearson Test 1", "Serengeti Practice Exam"), even if spelled slightly wrong ("Serengetic" means "Serengeti")',
+    "first_name": "First names",
+    "last_name": "Last names",
+    "password": "Passwords"
+})
+
+# Extra guidance for intents whose answers are often bare values
+ENTITY_FIELD_RULES = MappingProxyType({
+    "create_student": """
+        - Map a single word/name to the FIRST missing field in this order: first_name, last_name, student_id, password
+        - Parse comma-separated values: "John, Doe, password123" = first_name:"John", last_name:"Doe", password:"password123"
+        - Look for patterns like "John Doe" for first and last names"""
+})
+
+ENTITY_FIELD_EXAMPLES = MappingProxyType({
+    "schedule_exam": '{"student_id": "john@example.com", "exam_name": "Serengeti Practice Exam"}',
+    "get_results": '{"student_id": "john@example.com", "exam_name": "Serengeti Certification"}',
+    "create_student": '{"first_name": "Tim", "last_name": "David", "student_id": "Tim1212", "password": "MyPass123"}',
+    "list_scheduled_exams": '{"student_id": "john@example.com"}'
+})
+
+def _intent_extraction_system(intent: str) -> SystemMessage:
+    """Build the extraction instructions covering only the fields an intent needs"""
+    fields = "\n".join(
+        f"        - {field}: {ENTITY_FIELD_DESCRIPTIONS[field]}" for field in REQUIRED_FIELDS[intent]
+    )
+    return SystemMessage(content=f"""
+        Extract entities from the user input.
+
+        Extract ONLY the following entities if present:
+{fields}
+
+        RULES:
+        - "my [field] is X" means X is that field
+        - Preserve previously extracted entities if they're still relevant{ENTITY_FIELD_RULES.get(intent, "")}
+
+        Respond with a JSON object containing only the found entities.
+        Example: {ENTITY_FIELD_EXAMPLES[intent]}
+""")
+
+# Built once per intent: a known intent only needs its own fields, which
+# makes the prompt a fraction of the generic one
+INTENT_EXTRACTION_SYSTEMS = MappingProxyType({
+    intent: _intent_extraction_system(intent) for intent in REQUIRED_FIELDS
+})
+
+# ============================================================================
+# RESPONSE SCHEMAS
+# ============================================================================
+
+# Intents the classifier may answer with, as listed in its instructions
+CLASSIFIER_INTENTS = (
+    "list_exams", "get_exam", "list_students", "get_student", "create_student",
+    "schedule_exam", "list_scheduled_exams", "get_results", "help", "status"
+)
+ENTITY_FIELDS = ("student_id", "exam_id", "exam_name", "first_name", "last_name", "password")
+
+def _object_schema(properties: Dict[str, Dict]) -> Dict[str, Any]:
+    """JSON schema for an object with exactly these properties, as OpenAI strict mode requires"""
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False
+    }
+
+def _entities_schema(fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """JSON schema for extracted entities; fields that weren't found are null"""
+    return _object_schema({field: {"type": ["string", "null"]} for field in fields})
+
+def _response_format(name: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    """OpenAI response_format that makes the model's reply match the schema"""
+    return {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": schema}}
+
+# Reply schemas by prompt name (see get_prompt_llm); prompts without one get JSON mode
+PROMPT_RESPONSE_FORMATS = MappingProxyType({
+    "intent-classification": _response_format("classification", _object_schema({
+        "intent": {"type": "string", "enum": list(CLASSIFIER_INTENTS)},
+        "entities": _entities_schema(ENTITY_FIELDS)
+    })),
+    **{
+        f"entity-extraction-{intent}": _response_format("entities", _entities_schema(fields))
+        for intent, fields in REQUIRED_FIELDS.items()
+    }
+})
+
+def entity_extraction_prompt(state: AgentState) -> Optional[List[BaseMessage]]:
+    """Build the messages asking for the entities in the latest message, if there is one"""
+    latest_message = latest_human_message(state["messages"])
     if not latest_message:
-        return state
+        return None
     
     intent = state.get("current_intent", "")
-    
-    # Get previous entities to maintain context
     previous_entities = state.get("extracted_entities", {})
     missing_info = state.get("missing_info", [])
+    context = recent_conversation(state)
     
-    # Get conversation context (last few messages)
-    recent_messages = []
-    for msg in reversed(state["messages"][-6:]):  # Last 6 messages for context
-        if isinstance(msg, HumanMessage):
-            recent_messages.append(f"User: {msg.content}")
-        elif isinstance(msg, AIMessage):
-            recent_messages.append(f"Agent: {msg.content[:100]}...")
-    
-    context = "\n".join(reversed(recent_messages))
-    
-    prompt = f"""
-        Extract entities from this user input: "{latest_message}"
-
+    return [
+        INTENT_EXTRACTION_SYSTEMS.get(intent, ENTITY_EXTRACTION_SYSTEM),
+        HumanMessage(content=f"""
         Intent: {intent}
         Previous entities found: {previous_entities}
         Missing information: {missing_info}
@@ -292,90 +1048,281 @@ def entity_extractor_node(state: AgentState) -> AgentState:
         Recent conversation context:
         {context}
 
-        CONTEXT ANALYSIS:
-        - If intent is "create_student" and missing first_name: extract single word/name as first_name (e.g., "Tim" → first_name:"Tim")
-        - If intent is "create_student" and missing last_name: extract single word/name as last_name (e.g., "David" → last_name:"David")  
-        - If intent is "create_student" and missing student_id: extract any string as student_id (e.g., "Tim1212" → student_id:"Tim1212")
-        - If intent is "create_student" and missing password: extract any input as password
-        - For simple single-word inputs, map to the FIRST missing field in this order: first_name, last_name, student_id, password
-        - Simple inputs in create_student context should be mapped to missing fields
-
-        Extract ONLY the following entities if present:
-        - student_id: Any student identifier including email addresses, usernames, or IDs (like "SAMPLE+2523350510825", "john@example.com", "john123")
-        - exam_id: Exam IDs (usually alphanumeric strings)
-        - exam_name: Exam names (like "Serengeti Certification", "Pearson Test 1", "Serengeti Practice Exam")
-        - first_name: First names
-        - last_name: Last names
-        - password: Passwords
+        User input: "{latest_message}"
+    """)
+    ]
 
-        IMPORTANT RULES:
-        1. If the user mentions "Serengetic" they likely mean "Serengeti"
-        2. Extract email addresses as student_id (emails are valid student IDs)
-        3. For exam names, check for partial matches (e.g., "Serengetic" → "Serengeti Certification")
-        4. Preserve previously extracted entities if they're still relevant
-        5. If user says "my student ID is X" or "my email is X", extract X as student_id
-        6. If user mentions an exam name, extract it even if spelled slightly wrong
-        7. Parse comma-separated values: "John, Doe, password123" = first_name:"John", last_name:"Doe", password:"password123"
-        8. Look for patterns like "John Doe" for first and last names
-        9. For create_student intent: if user gives simple input, map to the missing field (single word usually goes to the currently missing field)
-        10. Extract "Tim" as first_name, "David" as last_name, "Tim1212" as student_id, "MyPass123" as password based on context
-        11. When user provides an email address, always extract it as student_id, not as a separate email field
-        12. Pattern matching: "my [field] is X" should extract X as that field
+def entity_extractor_node(state: AgentState) -> Dict[str, Any]:
+    """Extract entities from user input and validate them against the intent"""
+    # Entities extracted together with the intent, when the classifier called the LLM
+    new_entities = state.get("new_entities")
+    prompt = entity_extraction_prompt(state) if new_entities is None else None
+    
+    if prompt is not None:
+        try:
+            with trace("entity_extraction"):
+                llm = get_prompt_llm(f"entity-extraction-{state.get('current_intent')}")
+                new_entities = parse_llm_json(llm.invoke(prompt).content)
+        except Exception as e:
+            print(f"Entity extraction error: {e}")
+    
+    return merge_entities(state, new_entities)
 
-        Respond with a JSON object containing only the found entities.
-        Examples:
-        - Input "Tim" (when expecting first_name) → {{"first_name": "Tim"}}
-        - Input "David" (when expecting last_name) → {{"last_name": "David"}}
-        - Input "My last name is David" → {{"last_name": "David"}}
-        - Input "Tim1212" (when expecting student_id) → {{"student_id": "Tim1212"}}
-        - Input "JohnDoe" (when expecting password) → {{"password": "JohnDoe"}}
-    """
+async def aentity_extractor_node(state: AgentState) -> Dict[str, Any]:
+    """Async entity_extractor_node, awaiting the LLM instead of holding a worker thread"""
+    new_entities = state.get("new_entities")
+    prompt = entity_extraction_prompt(state) if new_entities is None else None
     
-    try:
-        with trace("entity_extraction"):
-            response = llm.invoke(prompt)
-            new_entities = json.loads(response.content)
-            
-        # Merge with previous entities, giving priority to new ones
-        merged_entities = previous_entities.copy()
-        merged_entities.update(new_entities)
-        
-        state["extracted_entities"] = merged_entities
-        print(f"🔍 Extracted entities: {merged_entities}")
+    if prompt is not None:
+        try:
+            async with trace("entity_extraction"):
+                llm = get_prompt_llm(f"entity-extraction-{state.get('current_intent')}")
+                new_entities = parse_llm_json((await llm.ainvoke(prompt)).content)
+        except Exception as e:
+            print(f"Entity extraction error: {e}")
+    
+    return merge_entities(state, new_entities)
+
+def _execute_list_exams(state: AgentState, instructor_id: str, entities: Dict) -> Dict[str, Any]:
+    """Look up the instructor's exam list"""
+    results = {}
+    exams = fetch_exams(state, instructor_id)
+    if exams is not None:
+        results["exams"] = {"exams": exams}
+    return results
+
+def _execute_schedule_exam(state: AgentState, instructor_id: str, entities: Dict) -> Dict[str, Any]:
+    """Schedule the named exam for the student"""
+    results = {}
+    student_id = entities.get("student_id")
+    exam_name = entities.get("exam_name")
+    
+    # The student lookup doesn't depend on the exam, so it runs while the
+    # exam list is fetched
+    user_id_future = submit_tool_call(resolve_user_id, instructor_id, student_id)
+    
+    # Step 1: Get exam data
+    exam_data = fetch_exams(state, instructor_id)
+    if exam_data is not None:
+        # Find exam ID by name
+        exam = find_exam(instructor_id, exam_data, exam_name)
+        exam_id = exam.get("EXAMID") if exam else None
         
-    except Exception as e:
-        print(f"Entity extraction error: {e}")
-        # Keep previous entities if extraction fails
-        state["extracted_entities"] = previous_entities
+        if exam_id:
+            # Step 2: Get student user_id
+            user_id = user_id_future.result()
+            
+            if user_id is not None:
+                state["user_id"] = user_id
+                
+                # Step 3: Schedule the exam
+                report_progress("🗓️ Scheduling the exam...")
+                schedule_result = get_tool_registry().execute_tool(
+                    "schedule_exam",
+                    instructor_id=instructor_id,
+                    exam_id=exam_id,
+                    user_id=user_id
+                )
+                results["schedule"] = schedule_result.get("data", schedule_result)
+                invalidate_tool_results(state, "list_scheduled_exams")
+            else:
+                results["error"] = "Student not found"
+        else:
+            # Scheduling the wrong exam can't be taken back, so a misspelled
+            # name is only suggested
+            similar = find_similar_exam(instructor_id, exam_data, exam_name)
+            results["error"] = f"Exam '{exam_name}' not found" + (
+                f". Did you mean '{similar.get('EXAMNAME')}'?" if similar else ""
+            )
+    return results
+
+def _execute_get_results(state: AgentState, instructor_id: str, entities: Dict) -> Dict[str, Any]:
+    """Collect every attempt, with statistics, of the student at the named exam"""
+    results = {}
+    student_id = entities.get("student_id")
+    exam_name = entities.get("exam_name")
     
-    return state
+    # Step 1: Get student user_id, while the exam list is fetched below
+    user_id_future = submit_tool_call(resolve_user_id, instructor_id, student_id)
+    exam_data = fetch_exams(state, instructor_id)
+    user_id = user_id_future.result()
+    
+    if user_id is not None:
+        state["user_id"] = user_id
+        
+        # Step 2: Get exam ID
+        if exam_data is not None:
+            # A read can tolerate a misspelled name rather than making the user ask again
+            exam = find_exam(instructor_id, exam_data, exam_name) or find_similar_exam(instructor_id, exam_data, exam_name)
+            exam_id = exam.get("EXAMID") if exam else None
+            
+            if exam_id:
+                if exam.get("EXAMNAME", "").lower() != exam_name.lower():
+                    print(f"🔎 Matched exam '{exam_name}' to '{exam.get('EXAMNAME')}'")
+                # Attempts carry the exam's real name, which a misspelled one won't equal
+                exam_name = exam.get("EXAMNAME", exam_name)
+                
+                # Step 3: Get scheduled exams
+                scheduled_result = session_tool_call(
+                    state,
+                    "list_scheduled_exams",
+                    instructor_id=instructor_id,
+                    user_id=user_id,
+                    exam_id=exam_id
+                )
+                
+                if scheduled_result.get("status"):
+                    scheduled_exams = scheduled_result.get("data", {}).get("students", [])
+                    
+                    # Find ALL attempts for this student and exam, comparing
+                    # each row against names case-folded once up front
+                    wanted = (student_id.casefold(), exam_name.casefold())
+                    matching_attempts = [
+                        exam for exam in scheduled_exams
+                        if (exam.get("STUDENTID", "").casefold(), exam.get("EXAMNAME", "").casefold()) == wanted
+                    ]
+                    
+                    if matching_attempts:
+                        print(f"🔧 Found {len(matching_attempts)} attempts for {student_id}")
+                        report_progress(f"📊 Fetching {len(matching_attempts)} attempt(s)...")
+                        
+                        # Get detailed info for all attempts; every attempt and
+                        # statistics lookup is independent, so they all run at once
+                        calls = []
+                        for attempt in matching_attempts:
+                            user_exam_id = attempt.get("USEREXAMID")
+                            
+                            # Basic attempt info, then statistics (may fail for some attempts)
+                            calls.append(("get_exam_attempt", {
+                                "instructor_id": instructor_id,
+                                "user_exam_id": user_exam_id
+                            }))
+                            calls.append(("get_student_exam_statistics", {
+                                "instructor_id": instructor_id,
+                                "student_id": student_id,
+                                "user_exam_id": user_exam_id
+                            }))
+                        lookup_results = run_tool_calls(state, calls)
+                        
+                        all_attempts = []
+                        for i, attempt in enumerate(matching_attempts):
+                            attempt_result, stats_result = lookup_results[2 * i], lookup_results[2 * i + 1]
+                            all_attempts.append({
+                                "user_exam_id": attempt.get("USEREXAMID"),
+                                "attempt_info": attempt_result.get("data", attempt_result),
+                                "statistics": stats_result.get("data", stats_result),
+                                "scheduled_data": attempt  # Original scheduled exam data
+                            })
+                        
+                        results["results"] = {
+                            "all_attempts": all_attempts,
+                            "student_id": student_id,
+                            "exam_name": exam_name,
+                            "total_attempts": len(all_attempts)
+                        }
+                    else:
+                        results["error"] = "No exam attempt found for this student"
+                else:
+                    results["error"] = "Failed to get scheduled exams"
+            else:
+                results["error"] = f"Exam '{exam_name}' not found"
+    else:
+        results["error"] = "Student not found"
+    return results
 
-def validation_node(state: AgentState) -> AgentState:
-    """Validate if we have required information for the intent"""
-    
-    intent = state.get("current_intent", "")
-    entities = state.get("extracted_entities", {})
-    missing_info = []
-    
-    # Define required fields for each intent
-    required_fields = {
-        "schedule_exam": ["student_id", "exam_name"],
-        "get_results": ["student_id", "exam_name"],
-        "create_student": ["first_name", "last_name", "student_id", "password"],
-        "list_scheduled_exams": ["student_id"]
-    }
+def _execute_create_student(state: AgentState, instructor_id: str, entities: Dict) -> Dict[str, Any]:
+    """Create the student account"""
+    results = {}
+    first_name = entities.get("first_name")
+    last_name = entities.get("last_name")
+    student_id = entities.get("student_id")
+    password = entities.get("password")
+    
+    # A double-submitted request shares the first call's result
+    report_progress("👤 Creating the student account...")
+    result = _create_student_calls.do(
+        (instructor_id, student_id.lower()),
+        get_tool_registry().execute_tool,
+        "create_student",
+        instructor_id=instructor_id,
+        first_name=first_name,
+        last_name=last_name,
+        student_id=student_id,
+        password=password
+    )
+    results["create_student"] = result.get("data", result)
     
-    if intent in required_fields:
-        for field in required_fields[intent]:
-            if not entities.get(field):
-                missing_info.append(field)
+    # New students usually register for an exam next, so warm the exam list
+    if results["create_student"].get("status"):
+        prefetch_exams(instructor_id)
+    return results
+
+def _execute_list_students(state: AgentState, instructor_id: str, entities: Dict) -> Dict[str, Any]:
+    """Look up the instructor's students"""
+    results = {}
+    result = get_tool_registry().execute_tool("list_students", instructor_id=instructor_id)
+    if result.get("status"):
+        results["students"] = result.get("data", {})
+    return results
+
+def _execute_list_scheduled_exams(state: AgentState, instructor_id: str, entities: Dict) -> Dict[str, Any]:
+    """Find the exams the student is scheduled for"""
+    results = {}
+    student_id = entities.get("student_id")
     
-    state["missing_info"] = missing_info
-    print(f"✅ Validation - Missing info: {missing_info}")
+    # First get the user_id from student_id
+    user_id = resolve_user_id(instructor_id, student_id)
     
-    return state
-
-def tool_execution_node(state: AgentState) -> AgentState:
+    if user_id is not None:
+        
+        # Get all available exams first
+        all_exams = fetch_exams(state, instructor_id)
+        
+        if all_exams is not None:
+            all_scheduled_exams = []
+            
+            # Check each exam individually for scheduling; the lookups are
+            # independent, so they run concurrently (results keep exam order)
+            exam_ids = [exam.get("EXAMID") for exam in all_exams if exam.get("EXAMID")]
+            report_progress(f"🗓️ Checking {len(exam_ids)} exams...")
+            scheduled_results = run_tool_calls(state, [
+                ("list_scheduled_exams", {"instructor_id": instructor_id, "user_id": user_id, "exam_id": exam_id})
+                for exam_id in exam_ids
+            ])
+            
+            for scheduled_result in scheduled_results:
+                if scheduled_result.get("status"):
+                    scheduled_exams = scheduled_result.get("data", {}).get("students", [])
+                    # Filter out NULL entries and add valid scheduled exams
+                    for scheduled_exam in scheduled_exams:
+                        if (scheduled_exam and 
+                            scheduled_exam != {"NULL": None} and 
+                            scheduled_exam.get("EXAMID")):
+                            all_scheduled_exams.append(scheduled_exam)
+            
+            results["scheduled_exams"] = {"students": all_scheduled_exams}
+            results["student_info"] = {"student_id": student_id, "user_id": user_id}
+        else:
+            results["error"] = "Failed to retrieve exams list"
+    else:
+        results["error"] = f"Student '{student_id}' not found"
+    return results
+
+# Tool calls for each intent; each executor returns the context for the
+# response formatter and may record lookups (user_id, exam_data) in state
+TOOL_EXECUTORS = MappingProxyType({
+    "list_exams": _execute_list_exams,
+    "schedule_exam": _execute_schedule_exam,
+    "get_results": _execute_get_results,
+    "create_student": _execute_create_student,
+    "list_students": _execute_list_students,
+    "list_scheduled_exams": _execute_list_scheduled_exams,
+})
+
+# State keys written back by the tool execution node
+TOOL_EXECUTION_KEYS = ("instructor_id", "user_id", "exam_data", "exam_data_ts", "tool_results", "context")
+
+def tool_execution_node(state: AgentState) -> Dict[str, Any]:
     """Execute tools based on intent and entities"""
     
     intent = state.get("current_intent", "")
@@ -384,233 +1331,29 @@ def tool_execution_node(state: AgentState) -> AgentState:
     
     # If we have missing info, skip tool execution
     if missing_info:
-        return state
+        return {}
+    
+    # Values before the tools ran, to tell which keys they changed
+    previous = {key: state.get(key) for key in TOOL_EXECUTION_KEYS}
     
     # Ensure we have instructor_id
-    if not state.get("instructor_id"):
+    instructor_id = state.get("instructor_id")
+    if not instructor_id:
         # Get instructor ID first
-        tool_registry = get_tool_registry()
-        result = tool_registry.execute_tool("get_instructor_id")
+        result = get_tool_registry().execute_tool("get_instructor_id")
         if result.get("status"):
-            instructor_data = result.get("data", {})
-            state["instructor_id"] = instructor_data.get("instructor_id")
-            print(f"🔑 Got instructor_id: {state['instructor_id']}")
+            instructor_id = result.get("data", {}).get("instructor_id")
+            state["instructor_id"] = instructor_id
+            print(f"🔑 Got instructor_id: {instructor_id}")
     
-    instructor_id = state.get("instructor_id")
     if not instructor_id:
-        state["context"] = {"error": "Failed to get instructor ID"}
-        return state
+        return {"context": {"error": "Failed to get instructor ID"}}
     
     # Execute tools based on intent
-    tool_registry = get_tool_registry()
-    results = {}
-    
     try:
-        if intent == "list_exams":
-            result = tool_registry.execute_tool("list_exams", instructor_id=instructor_id)
-            if result.get("status"):
-                results["exams"] = result.get("data", {})
-                
-        elif intent == "schedule_exam":
-            student_id = entities.get("student_id")
-            exam_name = entities.get("exam_name")
-            
-            # Step 1: Get exam data
-            exams_result = tool_registry.execute_tool("list_exams", instructor_id=instructor_id)
-            if exams_result.get("status"):
-                exam_data = exams_result.get("data", {}).get("exams", [])
-                state["exam_data"] = exam_data
-                
-                # Find exam ID by name
-                exam_id = None
-                for exam in exam_data:
-                    if exam.get("EXAMNAME") == exam_name:
-                        exam_id = exam.get("EXAMID")
-                        break
-                
-                if exam_id:
-                    # Step 2: Get student user_id
-                    student_result = tool_registry.execute_tool(
-                        "search_student_by_student_id",
-                        instructor_id=instructor_id,
-                        student_id=student_id
-                    )
-                    
-                    if student_result.get("status") and student_result.get("data", {}).get("found"):
-                        user_id = student_result.get("data", {}).get("user_id")
-                        state["user_id"] = user_id
-                        
-                        # Step 3: Schedule the exam
-                        schedule_result = tool_registry.execute_tool(
-                            "schedule_exam",
-                            instructor_id=instructor_id,
-                            exam_id=exam_id,
-                            user_id=user_id
-                        )
-                        results["schedule"] = schedule_result.get("data", schedule_result)
-                    else:
-                        results["error"] = "Student not found"
-                else:
-                    results["error"] = f"Exam '{exam_name}' not found"
-                        
-        elif intent == "get_results":
-            student_id = entities.get("student_id")
-            exam_name = entities.get("exam_name")
-            
-            # Step 1: Get student user_id
-            student_result = tool_registry.execute_tool(
-                "search_student_by_student_id",
-                instructor_id=instructor_id,
-                student_id=student_id
-            )
-            
-            if student_result.get("status") and student_result.get("data", {}).get("found"):
-                user_id = student_result.get("data", {}).get("user_id") 
-                state["user_id"] = user_id
-                
-                # Step 2: Get exam ID
-                exams_result = tool_registry.execute_tool("list_exams", instructor_id=instructor_id)
-                if exams_result.get("status"):
-                    exam_data = exams_result.get("data", {}).get("exams", [])
-                    exam_id = None
-                    for exam in exam_data:
-                        if exam.get("EXAMNAME") == exam_name:
-                            exam_id = exam.get("EXAMID")
-                            break
-                    
-                    if exam_id:
-                        # Step 3: Get scheduled exams
-                        scheduled_result = tool_registry.execute_tool(
-                            "list_scheduled_exams",
-                            instructor_id=instructor_id,
-                            user_id=user_id,
-                            exam_id=exam_id
-                        )
-                        
-                        if scheduled_result.get("status"):
-                            scheduled_exams = scheduled_result.get("data", {}).get("students", [])
-                            
-                            # Find ALL attempts for this student and exam
-                            matching_attempts = []
-                            for exam in scheduled_exams:
-                                if (exam.get("STUDENTID", "").lower() == student_id.lower() and 
-                                    exam.get("EXAMNAME", "").lower() == exam_name.lower()):
-                                    matching_attempts.append(exam)
-                            
-                            if matching_attempts:
-                                print(f"🔧 Found {len(matching_attempts)} attempts for {student_id}")
-                                
-                                # Get detailed info for all attempts
-                                all_attempts = []
-                                for attempt in matching_attempts:
-                                    user_exam_id = attempt.get("USEREXAMID")
-                                    
-                                    # Get basic attempt info
-                                    attempt_result = tool_registry.execute_tool(
-                                        "get_exam_attempt",
-                                        instructor_id=instructor_id,
-                                        user_exam_id=user_exam_id
-                                    )
-                                    
-                                    # Try to get statistics (may fail for some attempts)
-                                    stats_result = tool_registry.execute_tool(
-                                        "get_student_exam_statistics",
-                                        instructor_id=instructor_id,
-                                        student_id=student_id,
-                                        user_exam_id=user_exam_id
-                                    )
-                                    
-                                    all_attempts.append({
-                                        "user_exam_id": user_exam_id,
-                                        "attempt_info": attempt_result.get("data", attempt_result),
-                                        "statistics": stats_result.get("data", stats_result),
-                                        "scheduled_data": attempt  # Original scheduled exam data
-                                    })
-                                
-                                results["results"] = {
-                                    "all_attempts": all_attempts,
-                                    "student_id": student_id,
-                                    "exam_name": exam_name,
-                                    "total_attempts": len(all_attempts)
-                                }
-                            else:
-                                results["error"] = "No exam attempt found for this student"
-                        else:
-                            results["error"] = "Failed to get scheduled exams"
-                    else:
-                        results["error"] = f"Exam '{exam_name}' not found"
-            else:
-                results["error"] = "Student not found"
-        
-        elif intent == "create_student":
-            first_name = entities.get("first_name")
-            last_name = entities.get("last_name")
-            student_id = entities.get("student_id")
-            password = entities.get("password")
-            
-            result = tool_registry.execute_tool(
-                "create_student",
-                instructor_id=instructor_id,
-                first_name=first_name,
-                last_name=last_name,
-                student_id=student_id,
-                password=password
-            )
-            results["create_student"] = result.get("data", result)
-        
-        elif intent == "list_students":
-            result = tool_registry.execute_tool("list_students", instructor_id=instructor_id)
-            if result.get("status"):
-                results["students"] = result.get("data", {})
-        
-        elif intent == "list_scheduled_exams":
-            student_id = entities.get("student_id")
-            
-            # First get the user_id from student_id
-            student_result = tool_registry.execute_tool(
-                "search_student_by_student_id",
-                instructor_id=instructor_id,
-                student_id=student_id
-            )
-            
-            if student_result.get("status") and student_result.get("data", {}).get("found"):
-                user_id = student_result.get("data", {}).get("user_id")
-                
-                # Get all available exams first
-                exams_result = tool_registry.execute_tool("list_exams", instructor_id=instructor_id)
-                
-                if exams_result.get("status"):
-                    all_exams = exams_result.get("data", {}).get("exams", [])
-                    all_scheduled_exams = []
-                    
-                    # Check each exam individually for scheduling
-                    for exam in all_exams:
-                        exam_id = exam.get("EXAMID")
-                        if exam_id:
-                            # Get scheduled exams for this specific exam
-                            scheduled_result = tool_registry.execute_tool(
-                                "list_scheduled_exams",
-                                instructor_id=instructor_id,
-                                user_id=user_id,
-                                exam_id=exam_id
-                            )
-                            
-                            if scheduled_result.get("status"):
-                                scheduled_exams = scheduled_result.get("data", {}).get("students", [])
-                                # Filter out NULL entries and add valid scheduled exams
-                                for scheduled_exam in scheduled_exams:
-                                    if (scheduled_exam and 
-                                        scheduled_exam != {"NULL": None} and 
-                                        scheduled_exam.get("EXAMID")):
-                                        all_scheduled_exams.append(scheduled_exam)
-                    
-                    results["scheduled_exams"] = {"students": all_scheduled_exams}
-                    results["student_info"] = {"student_id": student_id, "user_id": user_id}
-                else:
-                    results["error"] = "Failed to retrieve exams list"
-            else:
-                results["error"] = f"Student '{student_id}' not found"
-                
+        state["tool_results"] = fresh_tool_results(state)
+        executor = TOOL_EXECUTORS.get(intent)
+        results = executor(state, instructor_id, entities) if executor else {}
         state["context"] = results
         print(f"🔧 Tool execution results: {len(results)} results")
         
@@ -618,24 +1361,44 @@ def tool_execution_node(state: AgentState) -> AgentState:
         print(f"Tool execution error: {e}")
         state["context"] = {"error": str(e)}
     
-    return state
+    # Only write back what this node changed; LangGraph keeps the other keys,
+    # so an unchanged exam list is not copied into every turn's checkpoint
+    return {
+        key: state[key] for key in TOOL_EXECUTION_KEYS
+        if key in state and state[key] != previous[key]
+    }
 
-def format_contextual_missing_info_response(intent: str, missing_info: List[str], entities: Dict) -> str:
-    """Format contextual missing information responses"""
-    
-    if intent == "schedule_exam":
-        if "student_id" in missing_info and "exam_name" not in missing_info:
-            return """🤖 **Student ID Required**
+async def atool_execution_node(state: AgentState) -> Dict[str, Any]:
+    """Async tool_execution_node, awaiting its concurrent lookups on the graph's event loop"""
+    token = _graph_loop.set(asyncio.get_running_loop())
+    try:
+        return await asyncio.to_thread(tool_execution_node, state)
+    finally:
+        _graph_loop.reset(token)
 
-I see you want to register for an exam. I need your student ID or email address.
+_STUDENT_ID_FOR_LIST_GUIDANCE = """🤖 **Student ID Required**
+
+To show your scheduled exams, I need your student ID or email address.
 
 **Please provide your student ID** like:
 • "My student ID is john@example.com"
 • "I am John1212"
 • "Student ID: SAMPLE+123456"
 """
-        elif "exam_name" in missing_info and "student_id" not in missing_info:
-            return """🤖 **Exam Name Required**
+
+# Guidance for missing information, keyed by (intent, missing field).
+# A missing field of None means more than one field is missing.
+MISSING_INFO_GUIDANCE = MappingProxyType({
+    ("schedule_exam", "student_id"): """🤖 **Student ID Required**
+
+I see you want to register for an exam. I need your student ID or email address.
+
+**Please provide your student ID** like:
+• "My student ID is john@example.com"
+• "I am John1212"
+• "Student ID: SAMPLE+123456"
+""",
+    ("schedule_exam", "exam_name"): """🤖 **Exam Name Required**
 
 I have your student ID. Which exam would you like to register for?
 
@@ -645,9 +1408,8 @@ I have your student ID. Which exam would you like to register for?
 • Serengeti Certification
 
 **Just say:** "I want to register for [exam name]"
-"""
-        else:
-            return """🤖 **Registration Information Needed**
+""",
+    ("schedule_exam", None): """🤖 **Registration Information Needed**
 
 To register you for an exam, I need:
 
@@ -655,28 +1417,23 @@ To register you for an exam, I need:
 2. **Exam name** you want to register for
 
 **Example:** "I am john@example.com and want to register for Serengeti Practice Exam"
-"""
-    
-    elif intent == "get_results":
-        if "student_id" in missing_info and "exam_name" not in missing_info:
-            return """🤖 **Student ID Required**
+""",
+    ("get_results", "student_id"): """🤖 **Student ID Required**
 
 I see you want exam results. I need your student ID or email address.
 
 **Please provide your student ID** like:
 • "My student ID is john@example.com"
 • "I am SAMPLE+123456"
-"""
-        elif "exam_name" in missing_info and "student_id" not in missing_info:
-            return """🤖 **Exam Name Required**
+""",
+    ("get_results", "exam_name"): """🤖 **Exam Name Required**
 
 I have your student ID. Which exam results do you want to see?
 
 **Just say:** "Results for [exam name]"
 **Example:** "Results for Serengeti Certification"
-"""
-        else:
-            return """🤖 **Results Information Needed**
+""",
+    ("get_results", None): """🤖 **Results Information Needed**
 
 To get your exam results, I need:
 
@@ -684,25 +1441,24 @@ To get your exam results, I need:
 2. **Exam name** you want results for
 
 **Example:** "My ID is john@example.com, results for Serengeti Certification"
-"""
+""",
+    ("list_scheduled_exams", "student_id"): _STUDENT_ID_FOR_LIST_GUIDANCE,
+    ("list_scheduled_exams", None): _STUDENT_ID_FOR_LIST_GUIDANCE,
+})
+
+def format_contextual_missing_info_response(intent: str, missing_info: List[str], entities: Dict) -> str:
+    """Format contextual missing information responses"""
     
-    elif intent == "create_student":
+    if intent == "create_student":
         return format_student_creation_response(missing_info, entities)
     
-    elif intent == "list_scheduled_exams":
-        return """🤖 **Student ID Required**
-
-To show your scheduled exams, I need your student ID or email address.
-
-**Please provide your student ID** like:
-• "My student ID is john@example.com"
-• "I am John1212"
-• "Student ID: SAMPLE+123456"
-"""
+    missing_field = missing_info[0] if len(missing_info) == 1 else None
+    guidance = MISSING_INFO_GUIDANCE.get((intent, missing_field)) or MISSING_INFO_GUIDANCE.get((intent, None))
+    if guidance is not None:
+        return guidance
     
-    else:
-        missing_fields = ", ".join(missing_info)
-        return f"""🤖 **Information Required**
+    missing_fields = ", ".join(missing_info)
+    return f"""🤖 **Information Required**
 
 To {intent.replace('_', ' ')}, I need: {missing_fields}
 
@@ -752,48 +1508,54 @@ Almost done {first_name}! **Please create a password for your account.**
 I have all the information needed. Let me create your student account!
 """
 
-def response_formatter_node(state: AgentState) -> AgentState:
-    """Format the final response"""
-    
-    llm = get_llm()
-    
-    intent = state.get("current_intent", "")
-    missing_info = state.get("missing_info", [])
-    context = state.get("context", {})
-    entities = state.get("extracted_entities", {})
-    
-    # Handle missing information
-    if missing_info:
-        response_text = format_contextual_missing_info_response(intent, missing_info, entities)
-        response = AIMessage(content=response_text)
-        state["messages"].append(response)
-        return state
-    
-    # Handle errors
-    if "error" in context:
-        error_msg = context["error"]
-        response_text = f"❌ Error: {error_msg}"
-        response = AIMessage(content=response_text)
-        state["messages"].append(response)
-        return state
-    
-    # Format successful responses
-    if intent == "list_exams" and "exams" in context:
-        exams = context["exams"].get("exams", [])
-        response_text = f"""
+def build_reply(state: AgentState, response_text: str) -> Dict[str, Any]:
+    """Append the reply, dropping the oldest messages beyond the history cap"""
+    messages = state["messages"]
+    overflow = len(messages) + 1 - config.MAX_HISTORY_MESSAGES
+    removals = [RemoveMessage(id=msg.id) for msg in messages[:overflow]] if overflow > 0 else []
+    return {
+        "messages": removals + [AIMessage(content=response_text)],
+        "context_lines": [agent_context_line(response_text)]
+    }
+
+# Per-item templates, parsed once at import; each formats one line of a list reply
+_EXAM_LINE = "• **{name}**\n  ID: {exam_id}\n\n".format
+_STUDENT_LINE = "• **{first_name} {last_name}**\n  Email: {student_id}\n\n".format
+_ATTEMPT_DETAILS = (
+    "**Attempt Number:** {attempt_num}\n"
+    "**Signed Up:** {signup_date}\n"
+    "**Started:** {started_date}\n"
+    "**Completed:** {completed_date}\n"
+).format
+_SCHEDULED_EXAM_LINE = (
+    "• **{name}**\n"
+    "  Exam ID: {exam_id}\n"
+    "  Attempt #{attempt_num}\n"
+    "  Signed up: {signup_date}\n"
+    "  Started: {started_date}\n"
+    "  Completed: {completed_date}\n"
+    "  Score: {score}\n\n"
+).format
+
+def _format_list_exams(context: Dict, entities: Dict) -> str:
+    """Format the instructor's exam list"""
+    exams = context["exams"].get("exams", [])
+    header = f"""
 ### 📚 Available Exams
 
 Found **{len(exams)}** exams:
 
 """
-        for exam in exams[:10]:  # Limit to first 10
-            response_text += f"• **{exam.get('EXAMNAME', 'Unknown')}**\n"
-            response_text += f"  ID: {exam.get('EXAMID', 'N/A')}\n\n"
-    
-    elif intent == "schedule_exam" and "schedule" in context:
-        student_id = entities.get("student_id", "")
-        exam_name = entities.get("exam_name", "")
-        response_text = f"""
+    return header + "".join(
+        _EXAM_LINE(name=exam.get("EXAMNAME", "Unknown"), exam_id=exam.get("EXAMID", "N/A"))
+        for exam in exams[:10]  # Limit to first 10
+    )
+
+def _format_schedule_exam(context: Dict, entities: Dict) -> str:
+    """Format a successful exam registration"""
+    student_id = entities.get("student_id", "")
+    exam_name = entities.get("exam_name", "")
+    return f"""
 ### ✅ Exam Scheduled Successfully!
 
 **Student:** {student_id}
@@ -801,106 +1563,115 @@ Found **{len(exams)}** exams:
 
 The exam has been scheduled and the student can now take it.
 """
+
+def _format_get_results(context: Dict, entities: Dict) -> str:
+    """Format exam results for every attempt"""
+    results = context["results"]
+    student_id = results.get("student_id", entities.get("student_id", ""))
+    exam_name = results.get("exam_name", entities.get("exam_name", ""))
     
-    elif intent == "get_results" and "results" in context:
-        results = context["results"]
-        student_id = results.get("student_id", entities.get("student_id", ""))
-        exam_name = results.get("exam_name", entities.get("exam_name", ""))
-        
-        response_text = f"""
+    parts = [f"""
 ### 📊 Exam Results
 
 **Student:** {student_id}
 **Exam:** {exam_name}
 
-"""
+"""]
+    
+    # Handle multiple attempts
+    if "all_attempts" in results:
+        all_attempts = results["all_attempts"]
+        total_attempts = results.get("total_attempts", len(all_attempts))
+        
+        parts.append(f"**Total Attempts:** {total_attempts}\n\n")
         
-        # Handle multiple attempts
-        if "all_attempts" in results:
-            all_attempts = results["all_attempts"]
-            total_attempts = results.get("total_attempts", len(all_attempts))
+        for i, attempt_data in enumerate(all_attempts, 1):
+            attempt_info = attempt_data.get("attempt_info", {})
+            scheduled_data = attempt_data.get("scheduled_data", {})
             
-            response_text += f"**Total Attempts:** {total_attempts}\n\n"
+            parts.append(f"### 📝 Attempt #{i}\n\n")
             
-            for i, attempt_data in enumerate(all_attempts, 1):
-                attempt_info = attempt_data.get("attempt_info", {})
-                scheduled_data = attempt_data.get("scheduled_data", {})
+            if attempt_info and "exam_attempt" in attempt_info:
+                exam_data = attempt_info["exam_attempt"]
                 
-                response_text += f"### 📝 Attempt #{i}\n\n"
+                # Basic exam info
+                attempt_num = exam_data.get("EXAMATTEMPT", "N/A")
+                passing_score = exam_data.get("PASSINGSCORE", "N/A")
+                signup_date = exam_data.get("DATETIMESIGNEDUP", "N/A")
+                started_date = exam_data.get("DATETIMESTARTED", "Not Started")
+                completed_date = exam_data.get("DATETIMECOMPLETED", "Not Completed")
+                score = exam_data.get("SCORE")
                 
-                if attempt_info and "exam_attempt" in attempt_info:
-                    exam_data = attempt_info["exam_attempt"]
-                    
-                    # Basic exam info
-                    attempt_num = exam_data.get("EXAMATTEMPT", "N/A")
-                    passing_score = exam_data.get("PASSINGSCORE", "N/A")
-                    signup_date = exam_data.get("DATETIMESIGNEDUP", "N/A")
-                    started_date = exam_data.get("DATETIMESTARTED", "Not Started")
-                    completed_date = exam_data.get("DATETIMECOMPLETED", "Not Completed")
-                    score = exam_data.get("SCORE")
-                    
-                    response_text += f"**Attempt Number:** {attempt_num}\n"
-                    response_text += f"**Signed Up:** {signup_date}\n"
-                    response_text += f"**Started:** {started_date}\n"
-                    response_text += f"**Completed:** {completed_date}\n"
-                    
-                    if score is not None and score != "":
-                        response_text += f"**Score:** {score}%\n"
-                        if passing_score != "N/A":
-                            try:
-                                if float(score) >= float(passing_score):
-                                    response_text += f"**Result:** ✅ **PASSED** (Score: {score}% ≥ Required: {passing_score}%)\n"
-                                else:
-                                    response_text += f"**Result:** ❌ **FAILED** (Score: {score}% < Required: {passing_score}%)\n"
-                            except:
-                                response_text += f"**Result:** Score: {score}%\n"
-                    else:
-                        if completed_date and completed_date != "Not Completed" and completed_date != "None":
-                            response_text += f"**Status:** Completed but score not available\n"
-                        elif started_date and started_date != "Not Yet" and started_date != "Not Started":
-                            response_text += f"**Status:** In progress\n"
-                        else:
-                            response_text += f"**Status:** Not started\n"
-                    
-                    response_text += f"\n"
+                parts.append(_ATTEMPT_DETAILS(
+                    attempt_num=attempt_num,
+                    signup_date=signup_date,
+                    started_date=started_date,
+                    completed_date=completed_date
+                ))
                 
-                elif scheduled_data:
-                    # Fallback to scheduled data if attempt_info is not available
-                    signup_date = scheduled_data.get("DATETIMESIGNEDUP", "N/A")
-                    started_date = scheduled_data.get("DATETIMESTARTED", "Not Started") 
-                    completed_date = scheduled_data.get("DATETIMECOMPLETED", "Not Completed")
-                    attempt_num = scheduled_data.get("EXAMATTEMPT", "N/A")
-                    score = scheduled_data.get("SCORE")
-                    
-                    response_text += f"**Attempt Number:** {attempt_num}\n"
-                    response_text += f"**Signed Up:** {signup_date}\n"
-                    response_text += f"**Started:** {started_date}\n"
-                    response_text += f"**Completed:** {completed_date}\n"
-                    
-                    if score is not None and score != "":
-                        response_text += f"**Score:** {score}%\n"
+                if score is not None and score != "":
+                    parts.append(f"**Score:** {score}%\n")
+                    if passing_score != "N/A":
+                        try:
+                            if float(score) >= float(passing_score):
+                                parts.append(f"**Result:** ✅ **PASSED** (Score: {score}% ≥ Required: {passing_score}%)\n")
+                            else:
+                                parts.append(f"**Result:** ❌ **FAILED** (Score: {score}% < Required: {passing_score}%)\n")
+                        except:
+                            parts.append(f"**Result:** Score: {score}%\n")
+                else:
+                    if completed_date and completed_date != "Not Completed" and completed_date != "None":
+                        parts.append("**Status:** Completed but score not available\n")
+                    elif started_date and started_date != "Not Yet" and started_date != "Not Started":
+                        parts.append("**Status:** In progress\n")
                     else:
-                        response_text += f"**Status:** No score available\n"
-                    
-                    response_text += f"\n"
+                        parts.append("**Status:** Not started\n")
+                
+                parts.append("\n")
             
-            # Show passing score info at the end
-            if all_attempts and all_attempts[0].get("attempt_info", {}).get("exam_attempt", {}).get("PASSINGSCORE"):
-                passing_score = all_attempts[0]["attempt_info"]["exam_attempt"]["PASSINGSCORE"]
-                response_text += f"**Passing Score Required:** {passing_score}%\n"
+            elif scheduled_data:
+                # Fallback to scheduled data if attempt_info is not available
+                signup_date = scheduled_data.get("DATETIMESIGNEDUP", "N/A")
+                started_date = scheduled_data.get("DATETIMESTARTED", "Not Started") 
+                completed_date = scheduled_data.get("DATETIMECOMPLETED", "Not Completed")
+                attempt_num = scheduled_data.get("EXAMATTEMPT", "N/A")
+                score = scheduled_data.get("SCORE")
+                
+                parts.append(_ATTEMPT_DETAILS(
+                    attempt_num=attempt_num,
+                    signup_date=signup_date,
+                    started_date=started_date,
+                    completed_date=completed_date
+                ))
+                
+                if score is not None and score != "":
+                    parts.append(f"**Score:** {score}%\n")
+                else:
+                    parts.append("**Status:** No score available\n")
+                
+                parts.append("\n")
         
-        else:
-            response_text += "**Status:** No exam attempt data found.\n"
-            response_text += "This student may not have started the exam yet.\n"
+        # Show passing score info at the end
+        if all_attempts and all_attempts[0].get("attempt_info", {}).get("exam_attempt", {}).get("PASSINGSCORE"):
+            passing_score = all_attempts[0]["attempt_info"]["exam_attempt"]["PASSINGSCORE"]
+            parts.append(f"**Passing Score Required:** {passing_score}%\n")
     
-    elif intent == "create_student" and "create_student" in context:
-        student_result = context["create_student"]
-        entities = state.get("extracted_entities", {})
-        first_name = entities.get("first_name", "")
-        student_id = entities.get("student_id", "")
-        
-        if student_result.get("status"):
-            response_text = f"""
+    else:
+        parts.append(
+            "**Status:** No exam attempt data found.\n"
+            "This student may not have started the exam yet.\n"
+        )
+    
+    return "".join(parts)
+
+def _format_create_student(context: Dict, entities: Dict) -> str:
+    """Format the outcome of creating a student account"""
+    student_result = context["create_student"]
+    first_name = entities.get("first_name", "")
+    student_id = entities.get("student_id", "")
+    
+    if student_result.get("status"):
+        response_text = f"""
 ### ✅ Student Account Created Successfully!
 
 **Name:** {first_name}
@@ -908,68 +1679,72 @@ The exam has been scheduled and the student can now take it.
 
 Your account has been created and you can now register for exams!
 """
-        else:
-            error_msg = student_result.get("error", "Unknown error occurred")
-            response_text = f"""
+    else:
+        error_msg = student_result.get("error", "Unknown error occurred")
+        response_text = f"""
 ### ❌ Account Creation Failed
 
 **Error:** {error_msg}
 
 Please try again or contact support if the problem persists.
 """
-    
-    elif intent == "list_students" and "students" in context:
-        students = context["students"].get("students", [])
-        response_text = f"""
+    return response_text
+
+def _format_list_students(context: Dict, entities: Dict) -> str:
+    """Format the instructor's student list"""
+    student_data = context["students"]
+    students = student_data.get("students") or student_data.get("student_list") or []
+    header = f"""
 ### 👥 Students List
 
 Found **{len(students)}** students:
 
 """
-        for student in students[:10]:  # Limit to first 10
-            response_text += f"• **{student.get('FIRSTNAME', '')} {student.get('LASTNAME', '')}**\n"
-            response_text += f"  Email: {student.get('STUDENTID', 'N/A')}\n\n"
-    
-    elif intent == "list_scheduled_exams" and "scheduled_exams" in context:
-        scheduled_data = context["scheduled_exams"]
-        student_info = context.get("student_info", {})
-        student_id = student_info.get("student_id", "Unknown")
-        
-        scheduled_exams = scheduled_data.get("students", [])
-        
-        response_text = f"""
+    return header + "".join(
+        _STUDENT_LINE(
+            first_name=student.get("FIRSTNAME", ""),
+            last_name=student.get("LASTNAME", ""),
+            student_id=student.get("STUDENTID", "N/A")
+        )
+        for student in students[:10]  # Limit to first 10
+    )
+
+def _format_list_scheduled_exams(context: Dict, entities: Dict) -> str:
+    """Format a student's scheduled exams"""
+    scheduled_data = context["scheduled_exams"]
+    student_info = context.get("student_info", {})
+    student_id = student_info.get("student_id", "Unknown")
+    
+    scheduled_exams = scheduled_data.get("students", [])
+    
+    parts = [f"""
 ### 📅 Your Scheduled Exams
 
 **Student:** {student_id}
 
-"""
-        
-        if scheduled_exams and len(scheduled_exams) > 0 and scheduled_exams[0] != {"NULL": None}:
-            response_text += f"Found **{len(scheduled_exams)}** scheduled exam(s):\n\n"
-            
-            for exam in scheduled_exams:
-                exam_name = exam.get("EXAMNAME", "Unknown Exam")
-                exam_id = exam.get("EXAMID", "N/A")
-                user_exam_id = exam.get("USEREXAMID", "N/A")
-                signup_date = exam.get("DATETIMESIGNEDUP", "N/A")
-                started_date = exam.get("DATETIMESTARTED", "Not Started")
-                completed_date = exam.get("DATETIMECOMPLETED", "Not Completed")
-                attempt_num = exam.get("EXAMATTEMPT", "1")
-                score = exam.get("SCORE", "No score yet")
-                
-                response_text += f"• **{exam_name}**\n"
-                response_text += f"  Exam ID: {exam_id}\n"
-                response_text += f"  Attempt #{attempt_num}\n"
-                response_text += f"  Signed up: {signup_date}\n"
-                response_text += f"  Started: {started_date}\n"
-                response_text += f"  Completed: {completed_date}\n"
-                response_text += f"  Score: {score}\n\n"
-        else:
-            response_text += "**No scheduled exams found.**\n\nYou can register for available exams by saying:\n\"I want to register for [exam name]\""
+"""]
     
+    if scheduled_exams and len(scheduled_exams) > 0 and scheduled_exams[0] != {"NULL": None}:
+        parts.append(f"Found **{len(scheduled_exams)}** scheduled exam(s):\n\n")
+        
+        parts.extend(
+            _SCHEDULED_EXAM_LINE(
+                name=exam.get("EXAMNAME", "Unknown Exam"),
+                exam_id=exam.get("EXAMID", "N/A"),
+                attempt_num=exam.get("EXAMATTEMPT", "1"),
+                signup_date=exam.get("DATETIMESIGNEDUP", "N/A"),
+                started_date=exam.get("DATETIMESTARTED", "Not Started"),
+                completed_date=exam.get("DATETIMECOMPLETED", "Not Completed"),
+                score=exam.get("SCORE", "No score yet")
+            )
+            for exam in scheduled_exams
+        )
     else:
-        # Default response
-        response_text = f"""
+        parts.append("**No scheduled exams found.**\n\nYou can register for available exams by saying:\n\"I want to register for [exam name]\"")
+    
+    return "".join(parts)
+
+DEFAULT_RESPONSE = """
 ### 🤖 ExamBuilder Assistant
 
 I can help you with:
@@ -986,17 +1761,61 @@ I can help you with:
 
 How can I help you today?
 """
+
+# Formatter for each intent, with the context key its tool results are stored under
+RESPONSE_FORMATTERS = MappingProxyType({
+    "list_exams": ("exams", _format_list_exams),
+    "schedule_exam": ("schedule", _format_schedule_exam),
+    "get_results": ("results", _format_get_results),
+    "create_student": ("create_student", _format_create_student),
+    "list_students": ("students", _format_list_students),
+    "list_scheduled_exams": ("scheduled_exams", _format_list_scheduled_exams),
+})
+
+def response_formatter_node(state: AgentState) -> Dict[str, Any]:
+    """Format the final response"""
+    
+    intent = state.get("current_intent", "")
+    missing_info = state.get("missing_info", [])
+    context = state.get("context", {})
+    entities = state.get("extracted_entities", {})
+    
+    # Handle missing information
+    if missing_info:
+        response_text = format_contextual_missing_info_response(intent, missing_info, entities)
+        return build_reply(state, response_text)
+    
+    # Handle errors
+    if "error" in context:
+        error_msg = context["error"]
+        response_text = f"❌ Error: {error_msg}"
+        return build_reply(state, response_text)
+    
+    # Format successful responses
+    formatter = RESPONSE_FORMATTERS.get(intent)
+    if formatter is not None and formatter[0] in context:
+        response_text = formatter[1](context, entities)
+    else:
+        response_text = DEFAULT_RESPONSE
     
-    response = AIMessage(content=response_text)
-    state["messages"].append(response)
     print(f"📝 Generated response ({len(response_text)} chars)")
     
-    return state
+    # The add_messages reducer appends the reply and applies the removals
+    return build_reply(state, response_text)
 
 # ============================================================================
 # ROUTING LOGIC  
 # ============================================================================
 
+# Intents answered directly by the response formatter
+NO_TOOL_INTENTS = frozenset({"help", "status"})
+
+def route_after_classification(state: AgentState) -> str:
+    """Skip extraction and validation for fast-path commands"""
+    if state.get("fast_path"):
+        return "response_formatter"
+    return "entity_extractor"
+
 def should_continue(state: AgentState) -> str:
     """Determine the next node based on state"""
     
@@ -1005,7 +1824,7 @@ def should_continue(state: AgentState) -> str:
         return "response_formatter"
     
     intent = state.get("current_intent", "")
-    if intent in ["help", "status"]:
+    if intent in NO_TOOL_INTENTS:
         return "response_formatter"
     
     return "tool_execution"
@@ -1017,24 +1836,37 @@ def should_continue(state: AgentState) -> str:
 def create_langgraph_agent():
     """Create the LangGraph agent"""
     
+    # Imported here so importing this module doesn't pay for graph construction
+    from langgraph.graph import StateGraph, END, START
+    from langgraph.checkpoint.memory import MemorySaver
+    
     # Create the graph
     workflow = StateGraph(AgentState)
     
     # Add nodes
-    workflow.add_node("intent_classifier", intent_classifier_node)
-    workflow.add_node("entity_extractor", entity_extractor_node) 
-    workflow.add_node("validation", validation_node)
-    workflow.add_node("tool_execution", tool_execution_node)
+    # The LLM nodes await the model, and the tool node its concurrent API
+    # calls, when the graph runs asynchronously
+    workflow.add_node("intent_classifier", RunnableLambda(intent_classifier_node, afunc=aintent_classifier_node))
+    workflow.add_node("entity_extractor", RunnableLambda(entity_extractor_node, afunc=aentity_extractor_node))
+    workflow.add_node("tool_execution", RunnableLambda(tool_execution_node, afunc=atool_execution_node))
     workflow.add_node("response_formatter", response_formatter_node)
     
     # Add edges
     workflow.add_edge(START, "intent_classifier")
-    workflow.add_edge("intent_classifier", "entity_extractor")
-    workflow.add_edge("entity_extractor", "validation")
     
-    # Conditional routing after validation
+    # Fast-path commands go straight to the response formatter
+    workflow.add_conditional_edges(
+        "intent_classifier",
+        route_after_classification,
+        {
+            "entity_extractor": "entity_extractor",
+            "response_formatter": "response_formatter"
+        }
+    )
+    
+    # Conditional routing after extraction, which also validates
     workflow.add_conditional_edges(
-        "validation",
+        "entity_extractor",
         should_continue,
         {
             "tool_execution": "tool_execution",
@@ -1045,56 +1877,223 @@ def create_langgraph_agent():
     workflow.add_edge("tool_execution", "response_formatter")
     workflow.add_edge("response_formatter", END)
     
-    # Create memory for persistence
-    memory = MemorySaver()
+    # Create memory for persistence, unless a shared checkpointer was configured
+    memory = _checkpointer or MemorySaver()
     
     # Compile the graph
     app = workflow.compile(checkpointer=memory)
     
     return app
 
+# ============================================================================
+# REPLY CACHE
+# ============================================================================
+
+# Replies to stand-alone, read-only requests ("help", "list all exams") are
+# shared by every session for the exam list's cache TTL
+REPLY_CACHEABLE_INTENTS = frozenset({"help", "status", "list_exams"})
+_reply_cache = TTLCache(ttl=config.EXAM_CACHE_TTL_SECONDS, maxsize=256)
+
+def reply_cache_key(user_input: str) -> str:
+    """Normalize a message so trivially different spellings share a cache entry"""
+    return " ".join(user_input.lower().split())
+
+async def is_standalone_turn(agent, config_dict: Dict) -> bool:
+    """Whether the session isn't waiting for the user to supply missing information"""
+    snapshot = await agent.aget_state(config_dict)
+    return not snapshot.values.get("missing_info")
+
+async def acached_reply(agent, user_input: str, config_dict: Dict) -> Optional[str]:
+    """Answer from the reply cache, recording the turn in the session's history"""
+    cached = _reply_cache.get(reply_cache_key(user_input))
+    if cached is None:
+        return None
+    
+    intent, reply = cached
+    await agent.aupdate_state(
+        config_dict,
+        {
+            "messages": [HumanMessage(content=user_input), AIMessage(content=reply)],
+            "context_lines": [user_context_line(user_input), agent_context_line(reply)],
+            "current_intent": intent,
+            "missing_info": []
+        },
+        as_node="response_formatter"
+    )
+    print(f"⚡ Reply cache hit: {intent}")
+    return reply
+
+def remember_reply(user_input: str, state: Dict):
+    """Cache the reply of a turn that answered a read-only request without errors"""
+    intent = state.get("current_intent")
+    context = state.get("context", {})
+    if (intent not in REPLY_CACHEABLE_INTENTS or state.get("missing_info") or "error" in context
+            or any(isinstance(value, dict) and value.get("fromStaleCache") for value in context.values())):
+        return
+    _reply_cache.set(reply_cache_key(user_input), (intent, latest_ai_reply(state["messages"])))
+
 # ============================================================================
 # MAIN INTERFACE
 # ============================================================================
 
-# Global agent instance
-langgraph_agent = create_langgraph_agent()
+# Checkpointer shared by every worker (e.g. Redis); in-memory when None
+_checkpointer = None
+
+def use_checkpointer(checkpointer):
+    """Persist conversations with the given checkpointer instead of in memory"""
+    global _checkpointer
+    _checkpointer = checkpointer
+    get_langgraph_agent.cache_clear()
+
+@functools.cache
+def get_langgraph_agent():
+    """Get the global agent instance, compiling it on first use"""
+    return create_langgraph_agent()
+
+def warm_langgraph_agent():
+    """Compile the graph and create the LLM client and tool registry ahead of the first request"""
+    get_tool_registry()
+    get_llm()
+    get_langgraph_agent()
 
 def run_langgraph_agent(user_input: str, session_id: str = "default") -> str:
     """Main interface for the LangGraph agent"""
     
     try:
         with trace("langgraph_agent_execution"):
-            # Create the input message
-            input_message = HumanMessage(content=user_input)
-            
             # Run the agent
             config_dict = {"configurable": {"thread_id": session_id}}
             
-            result = langgraph_agent.invoke(
-                {"messages": [input_message]},
+            result = get_langgraph_agent().invoke(
+                turn_input(user_input),
                 config=config_dict
             )
             
-            # Get the latest AI message
-            for msg in reversed(result["messages"]):
-                if isinstance(msg, AIMessage):
-                    return msg.content
+            return latest_ai_reply(result["messages"])
+            
+    except Exception as e:
+        logger.exception("LangGraph agent error in session %s", session_id)
+        return f"❌ System error: {str(e)}"
+
+async def run_langgraph_agent_async(user_input: str, session_id: str = "default") -> str:
+    """Async interface for the LangGraph agent, awaited from the web server's event loop"""
+    
+    try:
+        async with trace("langgraph_agent_execution"):
+            agent = get_langgraph_agent()
+            config_dict = {"configurable": {"thread_id": session_id}}
+            
+            # A message answering an earlier question depends on the conversation
+            standalone = await is_standalone_turn(agent, config_dict)
+            if standalone:
+                reply = await acached_reply(agent, user_input, config_dict)
+                if reply is not None:
+                    return reply
             
-            return "I'm sorry, I couldn't process that request."
+            result = await agent.ainvoke(
+                turn_input(user_input),
+                config=config_dict
+            )
+            
+            if standalone:
+                remember_reply(user_input, result)
+            return latest_ai_reply(result["messages"])
             
     except Exception as e:
-        print(f"LangGraph agent error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("LangGraph agent error in session %s", session_id)
         return f"❌ System error: {str(e)}"
 
+# Conversations a batch runs at once, so a large batch doesn't flood the LLM provider
+BATCH_MAX_CONCURRENCY = 8
+
+async def run_langgraph_agent_batch(user_inputs: List[str], session_prefix: str = "batch") -> List[str]:
+    """Answer independent queries concurrently, each in its own throwaway session"""
+    semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+    # Concurrent batches must not share (and then forget) each other's sessions
+    batch_id = uuid.uuid4().hex
+    
+    async def run_one(index: int, user_input: str) -> str:
+        session_id = f"{session_prefix}-{batch_id}-{index}"
+        async with semaphore:
+            try:
+                return await run_langgraph_agent_async(user_input, session_id)
+            finally:
+                forget_langgraph_session(session_id)
+    
+    # Replies keep the order of the queries
+    return await asyncio.gather(*(run_one(i, user_input) for i, user_input in enumerate(user_inputs)))
+
+def latest_ai_reply(messages: List[BaseMessage]) -> str:
+    """Get the content of the latest AI message"""
+    for msg in reversed(messages):
+        if isinstance(msg, AIMessage):
+            return msg.content
+    
+    return "I'm sorry, I couldn't process that request."
+
+# Progress shown while a streamed turn runs, keyed by the node that just finished
+STREAM_PROGRESS = MappingProxyType({
+    "intent_classifier": "🔍 Reading the details...",
+    "entity_extractor": "⚙️ Working on it...",
+    "tool_execution": "📝 Preparing the answer..."
+})
+
+async def astream_langgraph_agent(user_input: str, session_id: str = "default") -> AsyncIterator[Dict[str, str]]:
+    """Stream progress events and then the reply for one turn of the LangGraph agent"""
+    replied = False
+    try:
+        agent = get_langgraph_agent()
+        config_dict = {"configurable": {"thread_id": session_id}}
+        
+        standalone = await is_standalone_turn(agent, config_dict)
+        if standalone:
+            reply = await acached_reply(agent, user_input, config_dict)
+            if reply is not None:
+                yield {"type": "message", "text": reply}
+                return
+        
+        # "custom" carries the progress tool executors report mid-node
+        async for mode, update in agent.astream(
+            turn_input(user_input),
+            config=config_dict,
+            stream_mode=["updates", "custom"]
+        ):
+            if mode == "custom":
+                yield {"type": "progress", "text": update["progress"]}
+                continue
+            
+            for node, node_update in update.items():
+                if node in STREAM_PROGRESS:
+                    yield {"type": "progress", "text": STREAM_PROGRESS[node]}
+                for msg in (node_update or {}).get("messages", []):
+                    if isinstance(msg, AIMessage):
+                        replied = True
+                        yield {"type": "message", "text": msg.content}
+        
+        if not replied:
+            yield {"type": "message", "text": "I'm sorry, I couldn't process that request."}
+        elif standalone:
+            remember_reply(user_input, (await agent.aget_state(config_dict)).values)
+    
+    except Exception as e:
+        logger.exception("LangGraph agent error in session %s", session_id)
+        yield {"type": "error", "text": f"❌ System error: {str(e)}"}
+
 def reset_langgraph_session(session_id: str = "default"):
     """Reset a session in the LangGraph agent"""
     # LangGraph with MemorySaver handles this automatically
     # We could clear specific thread data if needed
     print(f"🔄 Session {session_id} reset (handled by LangGraph)")
 
+def forget_langgraph_session(session_id: str):
+    """Drop an expired session's in-memory conversation history"""
+    from langgraph.checkpoint.memory import MemorySaver
+    
+    # Shared checkpointers (Redis) expire their own checkpoints
+    checkpointer = get_langgraph_agent().checkpointer
+    if isinstance(checkpointer, MemorySaver):
+        checkpointer.delete_thread(session_id)
+
 if __name__ == "__main__":
     # Test the LangGraph agent
     test_inputs = [
@@ -1103,11 +2102,17 @@ if __name__ == "__main__":
         "I am john@example.com and want to register for Serengeti Practice Exam"
     ]
     
+    async def stream_test_inputs():
+        """Print each test turn's progress and reply as they are streamed"""
+        for test_input in test_inputs:
+            print(f"\n🧪 Testing: {test_input}")
+            async for event in astream_langgraph_agent(test_input):
+                if event["type"] == "progress":
+                    print(f"⏳ {event['text']}")
+                else:
+                    print(f"📝 Response: {event['text']}")
+            print("-" * 50)
+    
     print("🤖 ExamBuilder LangGraph Agent")
     print("=" * 50)
-    
-    for test_input in test_inputs:
-        print(f"\n🧪 Testing: {test_input}")
-        response = run_langgraph_agent(test_input)
-        print(f"📝 Response: {response}")
-        print("-" * 50)
\ No newline at end of file
+    asyncio.run(stream_test_inputs())
@@ -0,0 +1,173 @@
+"""
+In-Memory Caching for ExamBuilder Multi-Agent System
+Thread-safe TTL + LRU cache used to avoid redundant ExamBuilder API calls
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a time-to-live"""
+
+    def __init__(self, ttl: float, maxsize: int = 1024,
+                 on_evict: Optional[Callable[[Hashable, Any], None]] = None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        # Called with (key, value) for entries dropped by expiry or LRU eviction
+        self.on_evict = on_evict
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a cached value, or default if it is missing or expired"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+
+            expires_at, value = entry
+            if expires_at > now:
+                # Mark as most recently used
+                self._data.move_to_end(key)
+                return value
+
+            del self._data[key]
+
+        if self.on_evict:
+            self.on_evict(key, value)
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value, dropping expired entries at the least recently used end and evicting when full"""
+        now = time.monotonic()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        evicted = []
+        with self._lock:
+            # Entries nobody reads again expire here instead of waiting for LRU eviction
+            while self._data:
+                oldest_key, (oldest_expires_at, oldest_value) = next(iter(self._data.items()))
+                if oldest_expires_at > now:
+                    break
+                del self._data[oldest_key]
+                evicted.append((oldest_key, oldest_value))
+            
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                evicted_key, (_, evicted_value) = self._data.popitem(last=False)
+                evicted.append((evicted_key, evicted_value))
+
+        if self.on_evict:
+            for evicted_key, evicted_value in evicted:
+                self.on_evict(evicted_key, evicted_value)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a value and return it"""
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        """Remove all cached values"""
+        with self._lock:
+            self._data.clear()
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Remove every entry whose key matches the predicate, returning how many were removed"""
+        with self._lock:
+            stale = [key for key in self._data if predicate(key)]
+            for key in stale:
+                del self._data[key]
+        return len(stale)
+
+    def __contains__(self, key: Hashable) -> bool:
+        sentinel = object()
+        return self.get(key, sentinel) is not sentinel
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+_MISSING = object()
+
+def cached(cache: TTLCache, ttl: Optional[float] = None,
+           should_cache: Callable[[Any], bool] = lambda result: True) -> Callable:
+    """Cache a function's results in a TTLCache, keyed by its name and arguments"""
+
+    def decorator(func: Callable) -> Callable:
+        name = func.__name__
+
+        def refresh(*args, **kwargs):
+            """Call func and replace its cached result, even if it has not expired"""
+            result = func(*args, **kwargs)
+            if should_cache(result):
+                cache.set((name, args, tuple(sorted(kwargs.items()))), result, ttl)
+            return result
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            result = cache.get((name, args, tuple(sorted(kwargs.items()))), _MISSING)
+            if result is not _MISSING:
+                return result
+            return refresh(*args, **kwargs)
+
+        wrapper.refresh = refresh
+        return wrapper
+
+    return decorator
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into a single execution"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable, *args, **kwargs) -> Any:
+        """Run func, or wait for the identical call already in flight and share its result"""
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+class AsyncSingleFlight:
+    """Collapse concurrent awaits with the same key into a single task"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, func: Callable, *args, **kwargs) -> Any:
+        """Await func, or the identical task already in flight"""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+
+        # Shield so one cancelled caller doesn't cancel the call for the others
+        return await asyncio.shield(task)
+
+    def _release(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
@@ -3,8 +3,11 @@ Configuration Management for ExamBuilder Multi-Agent System
 Centralized configuration with environment variable support
 """
 
+import atexit
+import logging
+import logging.handlers
 import os
-from typing import Optional
+import queue
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -24,24 +27,35 @@ class Config:
     GOOGLE_CLOUD_LOCATION: str = os.getenv("GOOGLE_CLOUD_LOCATION", "us-central1")
     
     # ExamBuilder API Configuration
-    EXAMBUILDER_API_KEY: str = os.getenv("EXAMBUILDER_API_KEY", "FE0F8C82239FF183")
-    EXAMBUILDER_API_SECRET: str = os.getenv("EXAMBUILDER_API_SECRET", "A227A6838F3D180A15E6D8ED")
+    EXAMBUILDER_API_KEY: str = os.getenv("EXAMBUILDER_API_KEY", "")
+    EXAMBUILDER_API_SECRET: str = os.getenv("EXAMBUILDER_API_SECRET", "")
     EXAMBUILDER_BASE_URL: str = os.getenv("EXAMBUILDER_BASE_URL", "https://instructor.exambuilder.com/v2")
     
     # LLM Configuration
     LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "openai")  # "openai", "gemini", or "vertexai"
-    LLM_MODEL: str = os.getenv("LLM_MODEL", "gpt-3.5-turbo")
+    LLM_MODEL: str = os.getenv("LLM_MODEL", "gpt-4o-mini")  # Only classifies and extracts, so a small model suffices
     LLM_TEMPERATURE: float = float(os.getenv("LLM_TEMPERATURE", "0"))
-    LLM_MAX_TOKENS: Optional[int] = int(os.getenv("LLM_MAX_TOKENS", "1000")) if os.getenv("LLM_MAX_TOKENS") else None
+    LLM_MAX_TOKENS: int = int(os.getenv("LLM_MAX_TOKENS", "256"))  # Replies are small JSON objects
+    LLM_STRUCTURED_OUTPUT: bool = os.getenv("LLM_STRUCTURED_OUTPUT", "True").lower() == "true"  # Needs an OpenAI model with json_schema support
     
     # Session Configuration
     SESSION_TIMEOUT_HOURS: int = int(os.getenv("SESSION_TIMEOUT_HOURS", "24"))
     MAX_SESSIONS: int = int(os.getenv("MAX_SESSIONS", "1000"))
-    
+    MAX_HISTORY_MESSAGES: int = int(os.getenv("MAX_HISTORY_MESSAGES", "50"))
+    REDIS_URL: str = os.getenv("REDIS_URL", "")  # Shared session store; in-memory when empty
+    SESSION_SECRET: str = os.getenv("SESSION_SECRET", "")  # Signs session cookies; required with WEB_CONCURRENCY > 1 or REDIS_URL, random per process otherwise
+    SESSION_COOKIE_SECURE: bool = os.getenv("SESSION_COOKIE_SECURE", "False").lower() == "true"  # Set when served over HTTPS
+
+    # Cache Configuration
+    EXAM_CACHE_TTL_SECONDS: int = int(os.getenv("EXAM_CACHE_TTL_SECONDS", "30"))
+    USER_ID_CACHE_TTL_SECONDS: int = int(os.getenv("USER_ID_CACHE_TTL_SECONDS", "300"))
+
     # Server Configuration
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", "8000"))
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "1"))  # >1 needs REDIS_URL to share sessions; refused without it
+    UNIX_SOCKET: str = os.getenv("UNIX_SOCKET", "")  # Listen here instead of a TCP port, e.g. behind Caddy
     
     # Logging Configuration
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
@@ -91,4 +105,26 @@ config = Config()
 
 def get_config() -> Config:
     """Get the global configuration instance"""
-    return config 
\ No newline at end of file
+    return config
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue records as-is so the listener thread does the formatting, tracebacks included"""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+def get_logger() -> logging.Logger:
+    """Get the application logger, which writes from a background thread"""
+    logger = logging.getLogger("exambuilder")
+    if not logger.handlers:
+        log_queue = queue.SimpleQueue()
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        listener = logging.handlers.QueueListener(log_queue, stream_handler)
+        listener.start()
+        atexit.register(listener.stop)
+        
+        logger.addHandler(_DeferredQueueHandler(log_queue))
+        logger.setLevel(config.LOG_LEVEL)
+        logger.propagate = False
+    return logger
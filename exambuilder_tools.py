@@ -6,70 +6,452 @@ Based on the ExamBuilder API documentation at https://api.exambuilder.com/
 This file contains only the VERIFIED WORKING endpoints from testing.
 """
 
+import asyncio
 import requests
+import httpx
+import orjson
 import json
 import base64
-from typing import Dict, Optional
+import importlib.util
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import cache
+import config
 
-# ExamBuilder API Configuration
-BASE_URL = "https://instructor.exambuilder.com/v2"
-API_KEY = "FE0F8C82239FF183"
-API_SECRET = "A227A6838F3D180A15E6D8ED"
+# ExamBuilder API Configuration, from the environment (see .env.template)
+_config = config.get_config()
+BASE_URL = _config.EXAMBUILDER_BASE_URL.rstrip("/")
+API_KEY = _config.EXAMBUILDER_API_KEY
+API_SECRET = _config.EXAMBUILDER_API_SECRET
+
+# Fail at startup rather than on the first API call
+if not API_KEY or not API_SECRET:
+    raise RuntimeError("EXAMBUILDER_API_KEY and EXAMBUILDER_API_SECRET must be set")
 
 # Create base64 encoded credentials for Basic Auth
 credentials = f"{API_KEY}:{API_SECRET}"
 encoded_credentials = base64.b64encode(credentials.encode()).decode()
 
-# Authentication headers
+# Authentication headers (requests adds Content-Type itself when there is a JSON body)
 AUTH_HEADERS = {
-    "Authorization": f"Basic {encoded_credentials}",
-    "Content-Type": "application/json"
+    "Authorization": f"Basic {encoded_credentials}"
 }
 
+# (connect, read) timeouts so a hung connection can't block the agent forever
+REQUEST_TIMEOUT = (3.05, 10)
+
+# Per-endpoint overrides by final path segment: list endpoints return whole
+# rosters and get longer reads, while credential validation is tiny
+ENDPOINT_TIMEOUTS = MappingProxyType({
+    "validate.json": (2, 5),
+    "list.json": (3.05, 15),
+    "scheduled.json": (3.05, 15)
+})
+
+def _timeout_for(endpoint: str) -> tuple:
+    """Get the (connect, read) timeout for an endpoint."""
+    return ENDPOINT_TIMEOUTS.get(endpoint.rsplit("/", 1)[-1], REQUEST_TIMEOUT)
+
+# HTTP sessions are kept per thread: requests.Session is not thread-safe, and
+# agent tool calls run on web worker and prefetch threads concurrently
+_thread_local = threading.local()
+
+# Every thread's session mounts one shared adapter, so all tool calls draw
+# keep-alive connections from a single pool instead of each thread opening and
+# warming its own. The pool holds enough connections for the tool, prefetch and
+# bulk lookup threads to run at once.
+HTTP_POOL_MAXSIZE = 32
+
+# The shared pool is replaced periodically so long-idle pooled connections that
+# the server has already dropped are not reused indefinitely
+HTTP_SESSION_MAX_AGE_SECONDS = 3600
+
+_http_adapter: Optional[HTTPAdapter] = None
+_http_adapter_created_at = 0.0
+_http_adapter_lock = threading.Lock()
+
+def _create_http_adapter() -> HTTPAdapter:
+    """Create the keep-alive connection pool shared by every HTTP session."""
+    # Retry connection failures, rate limits and transient server errors for
+    # GETs and DELETEs only, waiting as long as a Retry-After header asks.
+    # After the last retry the error response is returned so its body can
+    # still be reported.
+    return HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset({"GET", "DELETE"}),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+    )
+
+def _get_http_adapter() -> HTTPAdapter:
+    """Get the shared connection pool, replacing it once it is too old."""
+    global _http_adapter, _http_adapter_created_at
+    with _http_adapter_lock:
+        if _http_adapter is None or time.monotonic() - _http_adapter_created_at > HTTP_SESSION_MAX_AGE_SECONDS:
+            # The old pool is not closed because other threads may still be
+            # using it; its connections are released once nothing refers to it
+            _http_adapter = _create_http_adapter()
+            _http_adapter_created_at = time.monotonic()
+        return _http_adapter
+
+def _create_http_session() -> requests.Session:
+    """Create an HTTP session with the API credentials attached."""
+    session = requests.Session()
+    # Credentials are attached once here instead of passed with every request
+    session.headers.update(AUTH_HEADERS)
+    return session
+
+def _get_http_session() -> requests.Session:
+    """Get this thread's HTTP session, mounted on the shared connection pool."""
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = _create_http_session()
+        _thread_local.session = session
+    
+    adapter = _get_http_adapter()
+    if getattr(_thread_local, "adapter", None) is not adapter:
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _thread_local.adapter = adapter
+    
+    return session
+
+SUPPORTED_METHODS = frozenset({"GET", "POST", "PUT", "DELETE"})
+
+# Identical GETs already in flight are shared instead of sent again
+_get_flights = cache.SingleFlight()
+_async_get_flights = cache.AsyncSingleFlight()
+
+def _request_key(endpoint: str, params: Optional[Dict]) -> tuple:
+    """Key identifying a GET request for coalescing."""
+    return (endpoint, tuple(sorted((params or {}).items())))
+
+# Last successful body of each GET with its validators (ETag / Last-Modified).
+# Validators let a response be revalidated with a conditional request instead of
+# downloaded and parsed again; the body is served stale while ExamBuilder is down.
+STALE_RESPONSE_MAX_AGE_SECONDS = 3600
+_last_responses = cache.TTLCache(ttl=STALE_RESPONSE_MAX_AGE_SECONDS, maxsize=512)
+
+# Background refreshes of stale responses, at most one per request
+_refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="stale-refresh")
+_pending_refreshes = set()
+_pending_refreshes_lock = threading.Lock()
+
+def _conditional_headers(key: Optional[tuple]) -> Optional[Dict]:
+    """Build If-None-Match / If-Modified-Since headers for a previously seen GET."""
+    entry = _last_responses.get(key) if key else None
+    if entry is None:
+        return None
+    
+    etag, last_modified, _ = entry
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers or None
+
+def _not_modified_body(key: Optional[tuple], response) -> Optional[Dict]:
+    """Return the stored body when the server answered 304 Not Modified."""
+    if key is None or response.status_code != 304:
+        return None
+    entry = _last_responses.get(key)
+    if entry is None:
+        return None
+    _last_responses.set(key, entry)
+    return entry[2]
+
+def _remember_response(key: Optional[tuple], response, body: Dict):
+    """Keep a successful GET body and its validators."""
+    if key is None:
+        return
+    _last_responses.set(key, (response.headers.get("ETag"), response.headers.get("Last-Modified"), body))
+
+def _stale_response(key: Optional[tuple], endpoint: str, params: Optional[Dict], response=None) -> Optional[Dict]:
+    """Serve the last good body of a GET that failed to connect or got a 5xx."""
+    if key is None or (response is not None and response.status_code < 500):
+        return None
+    entry = _last_responses.get(key)
+    if entry is None or not isinstance(entry[2], dict):
+        return None
+    
+    print(f"⚠️  ExamBuilder unavailable, serving stale response for {endpoint}")
+    with _pending_refreshes_lock:
+        if key not in _pending_refreshes:
+            _pending_refreshes.add(key)
+            _refresh_pool.submit(_refresh_stale, key, endpoint, params)
+    return {**entry[2], "fromStaleCache": True}
+
+def _refresh_stale(key: tuple, endpoint: str, params: Optional[Dict]):
+    """Re-fetch a GET in the background so its stored body is current once ExamBuilder recovers."""
+    try:
+        _send_request("GET", endpoint, None, params, allow_stale=False)
+    finally:
+        with _pending_refreshes_lock:
+            _pending_refreshes.discard(key)
+
 def _make_request(method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict:
     """Make an authenticated request to the ExamBuilder API."""
+    method = method.upper()
+    if method not in SUPPORTED_METHODS:
+        raise ValueError(f"Unsupported HTTP method: {method}")
+    
+    # Only idempotent GETs are coalesced
+    if method == "GET":
+        return _get_flights.do(_request_key(endpoint, params), _send_request, method, endpoint, data, params)
+    return _send_request(method, endpoint, data, params)
+
+def _send_request(method: str, endpoint: str, data: Optional[Dict], params: Optional[Dict],
+                  allow_stale: bool = True) -> Dict:
+    """Send a request over this thread's pooled session."""
     url = f"{BASE_URL}/{endpoint}"
+    key = _request_key(endpoint, params) if method == "GET" else None
     
     try:
-        if method.upper() == "GET":
-            response = requests.get(url, headers=AUTH_HEADERS, params=params)
-        elif method.upper() == "POST":
-            response = requests.post(url, headers=AUTH_HEADERS, json=data)
-        elif method.upper() == "PUT":
-            response = requests.put(url, headers=AUTH_HEADERS, json=data)
-        elif method.upper() == "DELETE":
-            response = requests.delete(url, headers=AUTH_HEADERS)
-        else:
-            raise ValueError(f"Unsupported HTTP method: {method}")
+        response = _get_http_session().request(
+            method,
+            url,
+            params=params,
+            json=data,
+            headers=_conditional_headers(key),
+            timeout=_timeout_for(endpoint)
+        )
+        not_modified = _not_modified_body(key, response)
+        if not_modified is not None:
+            return not_modified
         
         response.raise_for_status()
-        return response.json()
+        body = orjson.loads(response.content)
+        _remember_response(key, response, body)
+        return body
     
     except requests.exceptions.RequestException as e:
-        # Try to get more specific error information
-        error_details = f"API request failed: {str(e)}"
-        if hasattr(e.response, 'text') and e.response is not None:
-            try:
-                # Try to parse JSON error response
-                error_json = e.response.json()
-                if 'error' in error_json:
-                    error_details = f"API request failed: {str(e)} - Server response: {error_json['error']}"
-                elif 'message' in error_json:
-                    error_details = f"API request failed: {str(e)} - Server response: {error_json['message']}"
-            except:
-                # If not JSON, include raw response text
-                error_details = f"API request failed: {str(e)} - Server response: {e.response.text[:200]}"
+        stale = _stale_response(key, endpoint, params, e.response) if allow_stale else None
+        if stale is not None:
+            return stale
+        return _api_error(e, e.response)
+    except orjson.JSONDecodeError as e:
+        # A success status with a non-JSON body
+        return _api_error(e, response)
+
+# Auth failures carry no actionable body, so they are reported without parsing it
+AUTH_ERROR_CODES = MappingProxyType({
+    401: "API_AUTHENTICATION_FAILED",
+    403: "ROUTE_PERMISSION_ERROR"
+})
+
+# Only the start of a non-JSON error body is decoded for the message
+ERROR_BODY_PREVIEW_BYTES = 512
+
+def _api_error(error: Exception, response=None) -> Dict:
+    """Build the error result for a failed request, including the server's message if any."""
+    error_details = f"API request failed: {str(error)}"
+    return_code = "API_ERROR"
+    
+    if response is not None:
+        auth_error = AUTH_ERROR_CODES.get(response.status_code)
+        if auth_error:
+            error_details = f"{error_details} - {auth_error}"
+            return_code = "AUTH"
+        else:
+            error_details += _server_message(response.content)
+    
+    return {
+        "error": error_details,
+        "status": False,
+        "returnCode": return_code
+    }
+
+def _server_message(content: bytes) -> str:
+    """Extract the server's message from an error body."""
+    try:
+        error_json = orjson.loads(content)
+    except orjson.JSONDecodeError:
+        # If not JSON, include the start of the raw body
+        preview = content[:ERROR_BODY_PREVIEW_BYTES].decode("utf-8", errors="replace")
+        return f" - Server response: {preview[:200]}"
+    
+    if isinstance(error_json, dict):
+        if 'error' in error_json:
+            return f" - Server response: {error_json['error']}"
+        if 'message' in error_json:
+            return f" - Server response: {error_json['message']}"
+    return ""
+
+# ============================================================================
+# ASYNC HTTP CLIENT
+# ============================================================================
+
+# HTTP/2 lets concurrent calls share one connection; it needs the optional h2 package
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+
+class LoopLocalTransport(httpx.AsyncBaseTransport):
+    """Async transport with a separate connection pool for each event loop.
+
+    An httpx connection belongs to the event loop that opened it, so a client
+    kept for the life of the process (and used by e.g. every asyncio.run in a
+    script) needs one pool per loop. Pools of closed loops are dropped when the
+    next pool is created; a weak mapping wouldn't do, as each pool references
+    its loop.
+    """
+    
+    def __init__(self, **transport_options):
+        self._transport_options = transport_options
+        self._transports: Dict[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport] = {}
+    
+    def _current(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        transport = self._transports.get(loop)
+        if transport is None:
+            for other in list(self._transports):
+                if other.is_closed():
+                    self._transports.pop(other, None)
+            transport = self._transports[loop] = httpx.AsyncHTTPTransport(**self._transport_options)
+        return transport
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._current().handle_async_request(request)
+    
+    async def aclose(self):
+        """Close the running event loop's pooled connections."""
+        transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+# Failed connections are retried, matching the pooled requests sessions
+_async_transport = LoopLocalTransport(
+    http2=HTTP2_ENABLED,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+    retries=2
+)
+
+_async_client: Optional[httpx.AsyncClient] = None
+
+def _get_async_client() -> httpx.AsyncClient:
+    """Get the shared async client, creating it on first use."""
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(
+            transport=_async_transport,
+            base_url=f"{BASE_URL}/",
+            headers=AUTH_HEADERS,
+            timeout=httpx.Timeout(REQUEST_TIMEOUT[1], connect=REQUEST_TIMEOUT[0])
+        )
+    return _async_client
+
+async def _amake_request(method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict:
+    """Async variant of _make_request so several API calls can be awaited together."""
+    method = method.upper()
+    if method not in SUPPORTED_METHODS:
+        raise ValueError(f"Unsupported HTTP method: {method}")
+    
+    if method == "GET":
+        return await _async_get_flights.do(_request_key(endpoint, params), _asend_request, method, endpoint, data, params)
+    return await _asend_request(method, endpoint, data, params)
+
+async def _asend_request(method: str, endpoint: str, data: Optional[Dict], params: Optional[Dict]) -> Dict:
+    """Send a request over the shared async client."""
+    key = _request_key(endpoint, params) if method == "GET" else None
+    
+    try:
+        connect_timeout, read_timeout = _timeout_for(endpoint)
+        response = await _get_async_client().request(
+            method, endpoint, params=params, json=data, headers=_conditional_headers(key),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+        )
+        not_modified = _not_modified_body(key, response)
+        if not_modified is not None:
+            return not_modified
         
-        return {
-            "error": error_details,
-            "status": False,
-            "returnCode": "API_ERROR"
-        }
+        response.raise_for_status()
+        body = orjson.loads(response.content)
+        _remember_response(key, response, body)
+        return body
+    
+    except httpx.HTTPError as e:
+        stale = _stale_response(key, endpoint, params, getattr(e, "response", None))
+        if stale is not None:
+            return stale
+        return _api_error(e, getattr(e, "response", None))
+    except orjson.JSONDecodeError as e:
+        return _api_error(e, response)
+
+async def _aclose_async_client():
+    """Close the running event loop's pooled connections of the shared async client."""
+    await _async_transport.aclose()
+
+# ============================================================================
+# RESPONSE CACHE
+# ============================================================================
+
+# Read-only responses that rarely change are served from memory for a short
+# time; mutating calls invalidate the entries they affect
+_response_cache = cache.TTLCache(ttl=30, maxsize=512)
+
+def _is_cacheable(result: Dict) -> bool:
+    """Only fresh, successful API responses are cached."""
+    return (isinstance(result, dict) and "error" not in result and result.get("status", True) is not False
+            and not result.get("fromStaleCache"))
+
+def _invalidate_cached(*tool_names: str):
+    """Drop cached responses of the given tools after a mutation."""
+    _response_cache.invalidate(lambda key: key[0] in tool_names)
+
+# ============================================================================
+# ENDPOINT TABLE
+# ============================================================================
+
+# Simple endpoints described once: HTTP method, path template, and the tool
+# arguments sent as ExamBuilder query parameters (argument -> parameter)
+ENDPOINTS = MappingProxyType({
+    "get_instructor_id": ("GET", "validate.json", ()),
+    "list_exams": ("GET", "instructor/{instructor_id}/exam/list.json",
+                   (("exam_state", "examstate"), ("exam_name", "examname"))),
+    "get_exam": ("GET", "instructor/{instructor_id}/exam/{exam_id}.json", ()),
+    "list_students": ("GET", "instructor/{instructor_id}/student/list.json",
+                      (("first_name", "firstname"), ("last_name", "lastname"), ("student_id", "studentid"),
+                       ("sort", "sort"), ("sort_direction", "sortdirection"))),
+    "get_student": ("GET", "instructor/{instructor_id}/student/{student_id}.json", ()),
+    "list_group_categories": ("GET", "instructor/{instructor_id}/category/list.json", ()),
+    "list_scheduled_exams": ("GET", "instructor/{instructor_id}/student/scheduled.json",
+                             (("user_id", "userid"), ("exam_id", "examid"))),
+    "get_exam_attempt": ("GET", "instructor/{instructor_id}/student/userexam/{user_exam_id}/attempt.json", ()),
+    "get_student_exam_statistics": ("GET", "instructor/{instructor_id}/student/{student_id}/userexam/{user_exam_id}/stats.json", ()),
+    "unschedule_exam": ("DELETE", "instructor/{instructor_id}/student/userexam/{user_exam_id}/unschedule.json", ())
+})
+
+def _call_endpoint(name: str, **arguments) -> Dict:
+    """Call an endpoint from the table, sending only the query parameters that are set."""
+    method, path_template, query_params = ENDPOINTS[name]
+    params = {param: arguments[arg] for arg, param in query_params if arguments.get(arg)}
+    return _make_request(method, path_template.format_map(arguments), params=params or None)
+
+async def _acall_endpoint(name: str, **arguments) -> Dict:
+    """Async variant of _call_endpoint over the shared async client."""
+    method, path_template, query_params = ENDPOINTS[name]
+    params = {param: arguments[arg] for arg, param in query_params if arguments.get(arg)}
+    return await _amake_request(method, path_template.format_map(arguments), params=params or None)
+
+# Tools that are plain, uncached reads of a table endpoint; the tool registry
+# awaits these over the async client instead of blocking a thread on them
+ASYNC_ENDPOINT_TOOLS = frozenset({"list_scheduled_exams", "get_exam_attempt", "get_student_exam_statistics"})
 
 # ============================================================================
 # VERIFIED WORKING ENDPOINTS
 # ============================================================================
 
+@cache.cached(_response_cache, ttl=600, should_cache=_is_cacheable)
 def get_instructor_id() -> Dict:
     """
     Get the instructor ID for the authenticated user.
@@ -77,21 +459,10 @@ def get_instructor_id() -> Dict:
     
     ✅ VERIFIED WORKING
     """
-    # The validate.json endpoint is at the root level, not under /v2/
-    url = "https://instructor.exambuilder.com/v2/validate.json"
-    
-    try:
-        response = requests.get(url, headers=AUTH_HEADERS)
-        response.raise_for_status()
-        return response.json()
-    
-    except requests.exceptions.RequestException as e:
-        return {
-            "error": f"API request failed: {str(e)}",
-            "status": False,
-            "returnCode": "API_ERROR"
-        }
+    return _call_endpoint("get_instructor_id")
 
+# Not cached here: the agent keeps the one process-wide copy of the exam list
+# (agent.get_cached_exams), and another layer would only add to its staleness
 def list_exams(instructor_id: str, exam_name: Optional[str] = None, exam_state: str = "all") -> Dict:
     """
     List all exams available to the instructor.
@@ -103,13 +474,9 @@ def list_exams(instructor_id: str, exam_name: Optional[str] = None, exam_state:
     
     ✅ VERIFIED WORKING
     """
-    endpoint = f"instructor/{instructor_id}/exam/list.json"
-    params = {"examstate": exam_state}
-    if exam_name:
-        params["examname"] = exam_name
-    
-    return _make_request("GET", endpoint, params=params)
+    return _call_endpoint("list_exams", instructor_id=instructor_id, exam_name=exam_name, exam_state=exam_state)
 
+@cache.cached(_response_cache, ttl=60, should_cache=_is_cacheable)
 def get_exam(instructor_id: str, exam_id: str) -> Dict:
     """
     Get details of a specific exam.
@@ -120,9 +487,9 @@ def get_exam(instructor_id: str, exam_id: str) -> Dict:
     
     ✅ VERIFIED WORKING
     """
-    endpoint = f"instructor/{instructor_id}/exam/{exam_id}.json"
-    return _make_request("GET", endpoint)
+    return _call_endpoint("get_exam", instructor_id=instructor_id, exam_id=exam_id)
 
+@cache.cached(_response_cache, ttl=30, should_cache=_is_cacheable)
 def list_students(instructor_id: str, first_name: Optional[str] = None, last_name: Optional[str] = None,
                  student_id: Optional[str] = None, sort: Optional[str] = None, sort_direction: Optional[str] = None) -> Dict:
     """
@@ -138,21 +505,10 @@ def list_students(instructor_id: str, first_name: Optional[str] = None, last_nam
     
     ✅ VERIFIED WORKING
     """
-    endpoint = f"instructor/{instructor_id}/student/list.json"
-    params = {}
-    if first_name:
-        params["firstname"] = first_name
-    if last_name:
-        params["lastname"] = last_name
-    if student_id:
-        params["studentid"] = student_id
-    if sort:
-        params["sort"] = sort
-    if sort_direction:
-        params["sortdirection"] = sort_direction
-    
-    return _make_request("GET", endpoint, params=params)
+    return _call_endpoint("list_students", instructor_id=instructor_id, first_name=first_name, last_name=last_name,
+                          student_id=student_id, sort=sort, sort_direction=sort_direction)
 
+@cache.cached(_response_cache, ttl=30, should_cache=_is_cacheable)
 def get_student(instructor_id: str, student_id: str) -> Dict:
     """
     Get details of a specific student.
@@ -163,9 +519,9 @@ def get_student(instructor_id: str, student_id: str) -> Dict:
     
     ✅ VERIFIED WORKING
     """
-    endpoint = f"instructor/{instructor_id}/student/{student_id}.json"
-    return _make_request("GET", endpoint)
+    return _call_endpoint("get_student", instructor_id=instructor_id, student_id=student_id)
 
+@cache.cached(_response_cache, ttl=300, should_cache=_is_cacheable)
 def list_group_categories(instructor_id: str) -> Dict:
     """
     List all group categories available to the instructor.
@@ -175,8 +531,57 @@ def list_group_categories(instructor_id: str) -> Dict:
     
     ✅ VERIFIED WORKING
     """
-    endpoint = f"instructor/{instructor_id}/category/list.json"
-    return _make_request("GET", endpoint)
+    return _call_endpoint("list_group_categories", instructor_id=instructor_id)
+
+# Concurrent lookups per bulk call; identical in-flight GETs are still coalesced
+BULK_MAX_WORKERS = 16
+
+def _fetch_many(fetch, instructor_id: str, ids: List[str]) -> Dict:
+    """Run fetch(instructor_id, id) for each distinct ID concurrently."""
+    unique_ids = list(dict.fromkeys(ids))
+    if not unique_ids:
+        return {}
+    
+    with ThreadPoolExecutor(max_workers=min(BULK_MAX_WORKERS, len(unique_ids))) as pool:
+        return dict(zip(unique_ids, pool.map(lambda item_id: fetch(instructor_id, item_id), unique_ids)))
+
+def get_exams_bulk(instructor_id: str, exam_ids: List[str]) -> Dict:
+    """
+    Get details of several exams at once.
+    
+    Args:
+        instructor_id: The instructor ID from get_instructor_id()
+        exam_ids: The IDs of the exams to retrieve
+    
+    Returns:
+        Dict with overall status and the get_exam result for each exam ID
+    
+    🔧 READY FOR TESTING
+    """
+    results = _fetch_many(get_exam, instructor_id, exam_ids)
+    return {
+        "status": all(result.get("status", True) is not False for result in results.values()),
+        "results": results
+    }
+
+def get_students_bulk(instructor_id: str, student_ids: List[str]) -> Dict:
+    """
+    Get details of several students at once.
+    
+    Args:
+        instructor_id: The instructor ID from get_instructor_id()
+        student_ids: The IDs of the students to retrieve
+    
+    Returns:
+        Dict with overall status and the get_student result for each student ID
+    
+    🔧 READY FOR TESTING
+    """
+    results = _fetch_many(get_student, instructor_id, student_ids)
+    return {
+        "status": all(result.get("status", True) is not False for result in results.values()),
+        "results": results
+    }
 
 # ============================================================================
 # STUDENT MANAGEMENT FUNCTIONS
@@ -203,7 +608,9 @@ def create_student(instructor_id: str, first_name: str, last_name: str, student_
         "password": password
     }
     
-    return _make_request("POST", endpoint, data=data)
+    result = _make_request("POST", endpoint, data=data)
+    _invalidate_cached("list_students")
+    return result
 
 def update_student(instructor_id: str, student_id: str, first_name: Optional[str] = None, 
                   last_name: Optional[str] = None, new_student_id: Optional[str] = None,
@@ -239,7 +646,9 @@ def update_student(instructor_id: str, student_id: str, first_name: Optional[str
     if employee_number:
         data["employee_number"] = employee_number
     
-    return _make_request("PUT", endpoint, data=data)
+    result = _make_request("PUT", endpoint, data=data)
+    _invalidate_cached("list_students", "get_student")
+    return result
 
 # ============================================================================
 # SCHEDULING FUNCTIONS
@@ -256,14 +665,7 @@ def list_scheduled_exams(instructor_id: str, user_id: Optional[str] = None, exam
     
     🔧 READY FOR TESTING
     """
-    endpoint = f"instructor/{instructor_id}/student/scheduled.json"
-    params = {}
-    if user_id:
-        params["userid"] = user_id
-    if exam_id:
-        params["examid"] = exam_id
-    
-    return _make_request("GET", endpoint, params=params)
+    return _call_endpoint("list_scheduled_exams", instructor_id=instructor_id, user_id=user_id, exam_id=exam_id)
 
 def schedule_exam(instructor_id: str, exam_id: str, user_id: str) -> Dict:
     """
@@ -276,28 +678,61 @@ def schedule_exam(instructor_id: str, exam_id: str, user_id: str) -> Dict:
     
     🔧 READY FOR TESTING
     """
-    # First check if student is already scheduled for this exam
-    scheduled_result = list_scheduled_exams(instructor_id, user_id=user_id, exam_id=exam_id)
-    if scheduled_result.get("status"):
-        students = scheduled_result.get("students", [])
-        # Check if there are actual scheduled exams (not just {"NULL": null})
-        if students and len(students) > 0 and students[0] != {"NULL": None} and students[0].get("EXAMID"):
-            # Student is already scheduled for this specific exam
-            return {
-                "status": False,
-                "message": "This student is already scheduled to take this exam.",
-                "returnCode": "STUDENT_ALREADY_SCHEDULED",
-                "already_scheduled": True
-            }
+    # The API rejects duplicates with STUDENT_ALREADY_SCHEDULED, so no pre-check is needed
+    endpoint = f"instructor/{instructor_id}/student/exam/{exam_id}/schedule.json"
+    return _post_schedule(endpoint, user_id)
+
+# Concurrent schedule requests per bulk call, kept below BULK_MAX_WORKERS
+# since each one writes
+BULK_SCHEDULE_MAX_WORKERS = 8
+
+def schedule_exams_bulk(instructor_id: str, exam_id: str, user_ids: List[str]) -> Dict:
+    """
+    Schedule an exam for several students at once.
+    
+    Args:
+        instructor_id: The instructor ID from get_instructor_id()
+        exam_id: The ID of the exam to schedule
+        user_ids: The user IDs of the students
+    
+    Returns:
+        Dict with overall status and the schedule result for each user ID
     
+    🔧 READY FOR TESTING
+    """
+    # The API rejects students who are already scheduled, and _post_schedule
+    # reports that per student, so there is nothing to look up first
+    unique_user_ids = list(dict.fromkeys(user_ids))
     endpoint = f"instructor/{instructor_id}/student/exam/{exam_id}/schedule.json"
+    with ThreadPoolExecutor(max_workers=BULK_SCHEDULE_MAX_WORKERS) as pool:
+        results = dict(zip(
+            unique_user_ids,
+            pool.map(lambda user_id: _post_schedule(endpoint, user_id), unique_user_ids)
+        ))
     
+    return {
+        "status": all(result.get("status") for result in results.values()),
+        "results": results
+    }
+
+def _already_scheduled_result() -> Dict:
+    """Result returned when a student is already scheduled for the exam."""
+    return {
+        "status": False,
+        "message": "This student is already scheduled to take this exam.",
+        "returnCode": "STUDENT_ALREADY_SCHEDULED",
+        "already_scheduled": True
+    }
+
+def _post_schedule(endpoint: str, user_id: str) -> Dict:
+    """Send one schedule request and translate API errors."""
     # Try the official API documentation format first: "userId" (capital I)
     data = {"userId": user_id}
     result = _make_request("POST", endpoint, data=data)
     
     # If that fails with a specific error about the parameter, try the lowercase version
-    if "error" in result and ("userId" in str(result.get("error", "")).lower() or "parameter" in str(result.get("error", "")).lower()):
+    error_text = str(result.get("error", "")).lower()
+    if "error" in result and ("userid" in error_text or "parameter" in error_text):
         print(f"⚠️  Trying alternative parameter format: userid (lowercase)")
         data = {"userid": user_id}  # Try lowercase version
         result = _make_request("POST", endpoint, data=data)
@@ -306,12 +741,7 @@ def schedule_exam(instructor_id: str, exam_id: str, user_id: str) -> Dict:
     if "error" in result:
         error_msg = result["error"]
         if "STUDENT_ALREADY_SCHEDULED" in error_msg or "already scheduled" in error_msg.lower():
-            return {
-                "status": False,
-                "message": "This student is already scheduled to take this exam.",
-                "returnCode": "STUDENT_ALREADY_SCHEDULED",
-                "already_scheduled": True
-            }
+            return _already_scheduled_result()
         elif "INVALID_INSTRUCTOR" in error_msg:
             return {
                 "status": False,
@@ -354,8 +784,7 @@ def get_exam_attempt(instructor_id: str, user_exam_id: str) -> Dict:
     
     🔧 READY FOR TESTING
     """
-    endpoint = f"instructor/{instructor_id}/student/userexam/{user_exam_id}/attempt.json"
-    return _make_request("GET", endpoint)
+    return _call_endpoint("get_exam_attempt", instructor_id=instructor_id, user_exam_id=user_exam_id)
 
 def get_student_exam_statistics(instructor_id: str, student_id: str, user_exam_id: str) -> Dict:
     """
@@ -368,8 +797,8 @@ def get_student_exam_statistics(instructor_id: str, student_id: str, user_exam_i
     
     🔧 READY FOR TESTING
     """
-    endpoint = f"instructor/{instructor_id}/student/{student_id}/userexam/{user_exam_id}/stats.json"
-    return _make_request("GET", endpoint)
+    return _call_endpoint("get_student_exam_statistics", instructor_id=instructor_id, student_id=student_id,
+                          user_exam_id=user_exam_id)
 
 def unschedule_exam(instructor_id: str, user_exam_id: str) -> Dict:
     """
@@ -386,13 +815,30 @@ def unschedule_exam(instructor_id: str, user_exam_id: str) -> Dict:
     
     🔧 READY FOR TESTING
     """
-    endpoint = f"instructor/{instructor_id}/student/userexam/{user_exam_id}/unschedule.json"
-    return _make_request("DELETE", endpoint)
+    return _call_endpoint("unschedule_exam", instructor_id=instructor_id, user_exam_id=user_exam_id)
 
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
 
+# Student ID lookup tables built from list_students responses, reused for as
+# long as list_students keeps returning the same cached response
+_student_indexes = cache.TTLCache(ttl=30, maxsize=256)
+
+def _student_index(instructor_id: str, student_id: str, result: Dict) -> Dict[str, Dict]:
+    """Index a list_students response by case-folded Student ID."""
+    key = (instructor_id, student_id)
+    entry = _student_indexes.get(key)
+    if entry is not None and entry[0] is result:
+        return entry[1]
+    
+    index = {}
+    for student in result.get("students", []) or result.get("student_list", []):
+        # Keep the first student per ID, as a linear scan would
+        index.setdefault((student.get("STUDENTID") or "").casefold(), student)
+    _student_indexes.set(key, (result, index))
+    return index
+
 def search_student_by_student_id(instructor_id: str, student_id: str) -> Dict:
     """
     Search for a student by their Student ID (email) and return their User ID.
@@ -410,16 +856,15 @@ def search_student_by_student_id(instructor_id: str, student_id: str) -> Dict:
     result = list_students(instructor_id, student_id=student_id)
     
     if result.get("status"):
-        students = result.get("students", []) or result.get("student_list", [])
-        for student in students:
-            if student.get("STUDENTID", "").lower() == student_id.lower():
-                return {
-                    "status": True,
-                    "student": student,
-                    "found": True,
-                    "user_id": student.get("USERID"),
-                    "student_id": student.get("STUDENTID")
-                }
+        student = _student_index(instructor_id, student_id, result).get(student_id.casefold())
+        if student is not None:
+            return {
+                "status": True,
+                "student": student,
+                "found": True,
+                "user_id": student.get("USERID"),
+                "student_id": student.get("STUDENTID")
+            }
     
     return {
         "status": True,
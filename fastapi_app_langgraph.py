@@ -3,23 +3,117 @@ FastAPI App for ExamBuilder LangGraph Agent
 Proper LangGraph implementation with clean architecture
 """
 
-from fastapi import FastAPI, HTTPException, Request, Response
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi.routing import APIRoute
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
+import asyncio
+import gzip
+import hashlib
+import hmac
+import orjson
 import os
+import secrets
+import time
 import uuid
-from typing import Optional
-from agent import run_langgraph_agent, reset_langgraph_session
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Mapping, Optional, Tuple
+from agent import run_langgraph_agent_async, astream_langgraph_agent, reset_langgraph_session, forget_langgraph_session, use_checkpointer, warm_langgraph_agent, aclose_llm_client
 from tool_registry import get_tool_registry
-from config import get_config
+from config import get_config, get_logger
+from session_store import create_checkpointer, create_session_store
+from cache import TTLCache
+import exambuilder_tools
+
+# Get configuration
+config = get_config()
+logger = get_logger()
+
+# Session management - in-memory LRU by default, Redis when REDIS_URL is set.
+# Expired in-memory sessions take their conversation checkpoints with them.
+session_store = create_session_store(config, on_expire=forget_langgraph_session)
+
+# Refresh warmed API responses at 80% of the shortest TTL (list_group_categories, 300s)
+CACHE_REFRESH_SECONDS = 240
+CACHE_WARM_TIMEOUT_SECONDS = 10
+
+def warm_api_cache():
+    """Re-fetch the instructor ID and group categories into the response cache"""
+    result = exambuilder_tools.get_instructor_id.refresh()
+    instructor_id = result.get("instructor_id")
+    if instructor_id:
+        exambuilder_tools.list_group_categories.refresh(instructor_id)
+
+async def refresh_api_cache():
+    """Keep the warmed responses fresh so no request waits on a cold cache"""
+    while True:
+        await asyncio.sleep(CACHE_REFRESH_SECONDS)
+        try:
+            await asyncio.to_thread(warm_api_cache)
+        except Exception as e:
+            print(f"⚠️  Cache refresh failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Set up shared state and warm the API cache on startup, and release connections on shutdown"""
+    async with AsyncExitStack() as stack:
+        # Conversation history follows the session across workers when Redis is configured
+        checkpointer = create_checkpointer(config)
+        if checkpointer is not None:
+            use_checkpointer(await stack.enter_async_context(checkpointer))
+        
+        # Keep graph compilation and client setup off the first request
+        try:
+            await asyncio.to_thread(warm_langgraph_agent)
+        except Exception as e:
+            print(f"⚠️  Agent warm-up failed: {e!r}")
+        
+        try:
+            await asyncio.wait_for(asyncio.to_thread(warm_api_cache), CACHE_WARM_TIMEOUT_SECONDS)
+            print("🔥 API cache warmed")
+        except Exception as e:
+            print(f"⚠️  Cache warm-up failed: {e!r}")
+        refresh_task = asyncio.create_task(refresh_api_cache())
+        
+        yield
+        
+        refresh_task.cancel()
+        await session_store.close()
+        await exambuilder_tools._aclose_async_client()
+        await aclose_llm_client()
+
+class ORJSONRequest(Request):
+    """Request whose JSON body is decoded with orjson instead of the json module"""
+
+    async def json(self):
+        if not hasattr(self, "_json"):
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError, so FastAPI
+            # still turns bad bodies into 422 responses
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+class ORJSONRoute(APIRoute):
+    """Route that hands FastAPI an ORJSONRequest to parse request bodies from"""
+
+    def get_route_handler(self):
+        route_handler = super().get_route_handler()
+
+        async def orjson_route_handler(request: Request) -> Response:
+            return await route_handler(ORJSONRequest(request.scope, request.receive))
+
+        return orjson_route_handler
 
 # Initialize FastAPI app
 app = FastAPI(
     title="ExamBuilder LangGraph Agent API",
     description="AI Agent with Proper LangGraph Implementation",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
+app.router.route_class = ORJSONRoute
 
 # Add CORS middleware
 app.add_middleware(
@@ -30,26 +124,95 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Get configuration
-config = get_config()
+# Compress larger responses (the UI page, long chat replies, tool listings)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Web UI assets
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+INDEX_HTML = os.path.join(STATIC_DIR, "index.html")
+app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 # Configure environment variables for tracing
 os.environ["LANGCHAIN_TRACING_V2"] = "true"
 os.environ["LANGCHAIN_PROJECT"] = "exambuilder-langgraph-agent"
 
-# Session management
-sessions = {}
-
-def get_session_id(request: Request) -> str:
-    """Get or create a session ID for the current user."""
-    session_id = request.cookies.get("session_id")
-    if not session_id:
-        session_id = str(uuid.uuid4())
+# New session IDs are cut from one block of random bytes, so only every
+# 256th session costs an os.urandom call
+_random_pool = bytearray()
+
+def new_session_id() -> str:
+    """Create a random (version 4) UUID for a new session."""
+    global _random_pool
+    if len(_random_pool) < 16:
+        _random_pool = bytearray(secrets.token_bytes(4096))
+    random_bytes = bytes(_random_pool[:16])
+    del _random_pool[:16]
+    return str(uuid.UUID(bytes=random_bytes, version=4))
+
+# Session cookies are "<session id>.<issued at>.<HMAC>". A valid cookie is
+# trusted without a session store round trip until it is
+# SESSION_REVALIDATE_SECONDS old; then the session's expiry is extended and
+# the cookie re-issued
+SESSION_COOKIE = "session_id"
+SESSION_REVALIDATE_SECONDS = 300
+
+def load_session_secret(config) -> bytes:
+    """Get the cookie signing secret, random per process unless sessions are shared."""
+    if config.SESSION_SECRET:
+        return config.SESSION_SECRET.encode()
+    # Each worker would sign with its own random secret and reject the others' cookies
+    if config.WEB_CONCURRENCY > 1 or config.REDIS_URL:
+        raise RuntimeError("SESSION_SECRET must be set when WEB_CONCURRENCY > 1 or REDIS_URL is set")
+    return secrets.token_bytes(32)
+
+SESSION_SECRET = load_session_secret(config)
+
+def sign_session_id(session_id: str, issued_at: int) -> str:
+    """Build a session cookie value signed with the server secret."""
+    payload = f"{session_id}.{issued_at}"
+    signature = hmac.new(SESSION_SECRET, payload.encode(), hashlib.sha256).hexdigest()
+    return f"{payload}.{signature}"
+
+def verify_session_cookie(cookie: Optional[str]) -> Optional[Tuple[str, int]]:
+    """Return the session ID and issue time from a correctly signed cookie."""
+    try:
+        session_id, issued_at, signature = cookie.split(".")
+        issued_at = int(issued_at)
+    except (AttributeError, ValueError):
+        return None
+    
+    expected = hmac.new(SESSION_SECRET, f"{session_id}.{issued_at}".encode(), hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(signature, expected):
+        return None
+    return session_id, issued_at
+
+async def get_session_id(cookies: Mapping[str, str]) -> Tuple[str, Optional[str]]:
+    """Get or create a session ID for the current user, with the cookie to (re)issue if any."""
+    now = int(time.time())
+    session = verify_session_cookie(cookies.get(SESSION_COOKIE))
+    if session is not None and now - session[1] <= config.SESSION_TIMEOUT_HOURS * 3600:
+        session_id, issued_at = session
+        if now - issued_at < SESSION_REVALIDATE_SECONDS:
+            return session_id, None
+    else:
+        session_id = new_session_id()
     
-    if session_id not in sessions:
-        sessions[session_id] = {"created": True}
+    await session_store.touch(session_id)
     
-    return session_id
+    return session_id, sign_session_id(session_id, now)
+
+def set_session_cookie(response: Response, cookie: Optional[str]):
+    """Set the session cookie for future requests, if there is one to issue."""
+    if cookie is None:
+        return
+    response.set_cookie(
+        key=SESSION_COOKIE, 
+        value=cookie, 
+        httponly=True, 
+        secure=config.SESSION_COOKIE_SECURE,
+        samesite="strict",
+        max_age=config.SESSION_TIMEOUT_HOURS * 3600
+    )
 
 # Pydantic models
 class ChatMessage(BaseModel):
@@ -81,403 +244,66 @@ class ToolInfoResponse(BaseModel):
     categories: dict
 
 # Routes
+# The page is read and gzipped once at startup; each request just writes
+# prebuilt bytes, and browsers revalidate with the ETag
+with open(INDEX_HTML, "rb") as index_file:
+    INDEX_BYTES = index_file.read()
+INDEX_HEADERS = {
+    "Cache-Control": "public, max-age=300",
+    "ETag": f'W/"{hashlib.sha1(INDEX_BYTES).hexdigest()}"',
+    "Vary": "Accept-Encoding"
+}
+INDEX_RESPONSE = Response(INDEX_BYTES, media_type="text/html", headers=INDEX_HEADERS)
+INDEX_GZIP_RESPONSE = Response(
+    gzip.compress(INDEX_BYTES, 9),
+    media_type="text/html",
+    headers={**INDEX_HEADERS, "Content-Encoding": "gzip"}
+)
+INDEX_NOT_MODIFIED = Response(status_code=304, headers=INDEX_HEADERS)
+
 @app.get("/", response_class=HTMLResponse)
-async def index():
+async def index(request: Request):
     """Serve the main HTML page."""
-    return HTMLResponse("""
-    <!DOCTYPE html>
-    <html>
-        <head>
-            <title>ExamBuilder LangGraph Agent</title>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                * { margin: 0; padding: 0; box-sizing: border-box; }
-                body { 
-                    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; 
-                    height: 100vh; 
-                    display: flex; 
-                    flex-direction: column;
-                    background: #f5f5f5;
-                }
-                .header { 
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                    color: white; 
-                    padding: 15px 20px; 
-                    text-align: center;
-                    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-                }
-                .header h1 { font-size: 24px; margin-bottom: 5px; }
-                .header p { font-size: 14px; opacity: 0.9; }
-                
-                .chat-container { 
-                    flex: 1; 
-                    display: flex; 
-                    flex-direction: column; 
-                    max-width: 900px; 
-                    margin: 0 auto;
-                    width: 100%;
-                    background: white;
-                    box-shadow: 0 0 20px rgba(0,0,0,0.1);
-                }
-                
-                .messages-container { 
-                    flex: 1; 
-                    overflow-y: auto; 
-                    padding: 20px; 
-                    background: #fafafa;
-                }
-                
-                .message { 
-                    margin-bottom: 15px; 
-                    animation: slideIn 0.3s ease-out;
-                }
-                
-                @keyframes slideIn {
-                    from { opacity: 0; transform: translateY(10px); }
-                    to { opacity: 1; transform: translateY(0); }
-                }
-                
-                .user-message { 
-                    text-align: right; 
-                }
-                
-                .user-message .message-content { 
-                    background: #007bff; 
-                    color: white; 
-                    display: inline-block; 
-                    padding: 12px 16px; 
-                    border-radius: 18px 18px 4px 18px; 
-                    max-width: 70%;
-                    word-wrap: break-word;
-                }
-                
-                .agent-message .message-content { 
-                    background: white; 
-                    border: 1px solid #e0e0e0;
-                    display: inline-block; 
-                    padding: 12px 16px; 
-                    border-radius: 18px 18px 18px 4px; 
-                    max-width: 80%;
-                    white-space: pre-wrap;
-                    word-wrap: break-word;
-                    box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-                }
-                
-                .error .message-content { 
-                    background: #f8d7da; 
-                    border-color: #f5c6cb; 
-                    color: #721c24;
-                }
-                
-                .input-container { 
-                    padding: 20px; 
-                    border-top: 1px solid #e0e0e0; 
-                    background: white;
-                }
-                
-                .input-group { 
-                    display: flex; 
-                    gap: 10px; 
-                    align-items: center;
-                }
-                
-                #messageInput { 
-                    flex: 1; 
-                    padding: 12px 16px; 
-                    border: 2px solid #e0e0e0; 
-                    border-radius: 25px; 
-                    font-size: 16px;
-                    outline: none;
-                    transition: border-color 0.2s;
-                }
-                
-                #messageInput:focus { 
-                    border-color: #007bff; 
-                }
-                
-                button { 
-                    padding: 12px 20px; 
-                    background: #007bff; 
-                    color: white; 
-                    border: none; 
-                    border-radius: 25px; 
-                    cursor: pointer; 
-                    font-weight: 600;
-                    transition: background 0.2s;
-                }
-                
-                button:hover { 
-                    background: #0056b3; 
-                }
-                
-                button:disabled { 
-                    background: #ccc; 
-                    cursor: not-allowed; 
-                }
-                
-                .status-bar {
-                    padding: 10px 20px;
-                    background: #e8f5e8;
-                    border-bottom: 1px solid #c3e6c3;
-                    font-size: 14px;
-                    color: #2d5a2d;
-                }
-                
-                .links { 
-                    padding: 15px 20px; 
-                    background: #f8f9fa; 
-                    border-top: 1px solid #e0e0e0;
-                    text-align: center;
-                }
-                
-                .links a { 
-                    margin: 0 10px; 
-                    color: #007bff; 
-                    text-decoration: none; 
-                    font-size: 14px;
-                }
-                
-                .links a:hover { 
-                    text-decoration: underline; 
-                }
-                
-                .typing-indicator {
-                    padding: 10px 16px;
-                    color: #666;
-                    font-style: italic;
-                }
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>🎓 ExamBuilder LangGraph Agent</h1>
-            </div>
-            
-            <div class="status-bar" id="statusBar">
-                🔄 Connecting...
-            </div>
-            
-            <div class="chat-container">
-                <div class="messages-container" id="messagesContainer">
-                    <div class="message agent-message">
-                        <div class="message-content">
-                            👋 Welcome! I can help you with:
-                            • List available exams
-                            • Schedule exams for students  
-                            • Get exam results
-                            • Manage student accounts
-                            
-                            Try saying: "I need the list of exams" or "My student ID is [your-id] and I need results for [exam-name]"
-                        </div>
-                    </div>
-                </div>
-                
-                <div class="input-container">
-                    <div class="input-group">
-                        <input type="text" id="messageInput" placeholder="Type your message here..." onkeypress="handleKeypress(event)">
-                        <button id="sendButton" onclick="sendMessage()">Send</button>
-                        <button onclick="resetChat()">Reset</button>
-                    </div>
-                </div>
-            </div>
-            
-            <div class="links">
-                <a href="/api/status">System Status</a>
-                <a href="/api/tools">Available Tools</a>
-                <a href="/docs">API Documentation</a>
-                <a href="/api/health">Health Check</a>
-            </div>
-
-            <script>
-                let isProcessing = false;
-
-                function handleKeypress(event) {
-                    if (event.key === 'Enter' && !event.shiftKey) {
-                        event.preventDefault();
-                        sendMessage();
-                    }
-                }
-
-                async function sendMessage() {
-                    if (isProcessing) return;
-                    
-                    const input = document.getElementById('messageInput');
-                    const sendButton = document.getElementById('sendButton');
-                    const message = input.value.trim();
-                    
-                    if (!message) return;
-
-                    // Disable input while processing
-                    isProcessing = true;
-                    input.disabled = true;
-                    sendButton.disabled = true;
-                    sendButton.textContent = 'Sending...';
-
-                    // Add user message
-                    addUserMessage(message);
-                    input.value = '';
-
-                    // Show typing indicator
-                    const typingId = showTypingIndicator();
-
-                    try {
-                        const response = await fetch('/api/chat', {
-                            method: 'POST',
-                            headers: { 'Content-Type': 'application/json' },
-                            body: JSON.stringify({ message: message })
-                        });
-
-                        const data = await response.json();
-                        removeTypingIndicator(typingId);
-
-                        if (data.status === 'success') {
-                            addAgentMessage(data.response);
-                        } else {
-                            addErrorMessage(data.detail || 'Unknown error');
-                        }
-                    } catch (error) {
-                        removeTypingIndicator(typingId);
-                        addErrorMessage('Network error: ' + error.message);
-                    } finally {
-                        // Re-enable input
-                        isProcessing = false;
-                        input.disabled = false;
-                        sendButton.disabled = false;
-                        sendButton.textContent = 'Send';
-                        input.focus();
-                    }
-                }
-
-                function addUserMessage(message) {
-                    const container = document.getElementById('messagesContainer');
-                    const messageDiv = document.createElement('div');
-                    messageDiv.className = 'message user-message';
-                    messageDiv.innerHTML = `<div class="message-content">${escapeHtml(message)}</div>`;
-                    container.appendChild(messageDiv);
-                    scrollToBottom();
-                }
-
-                function addAgentMessage(message) {
-                    const container = document.getElementById('messagesContainer');
-                    const messageDiv = document.createElement('div');
-                    messageDiv.className = 'message agent-message';
-                    messageDiv.innerHTML = `<div class="message-content">${escapeHtml(message)}</div>`;
-                    container.appendChild(messageDiv);
-                    scrollToBottom();
-                }
-
-                function addErrorMessage(message) {
-                    const container = document.getElementById('messagesContainer');
-                    const messageDiv = document.createElement('div');
-                    messageDiv.className = 'message agent-message error';
-                    messageDiv.innerHTML = `<div class="message-content">❌ ${escapeHtml(message)}</div>`;
-                    container.appendChild(messageDiv);
-                    scrollToBottom();
-                }
-
-                function showTypingIndicator() {
-                    const container = document.getElementById('messagesContainer');
-                    const typingDiv = document.createElement('div');
-                    const id = 'typing-' + Date.now();
-                    typingDiv.id = id;
-                    typingDiv.className = 'message agent-message';
-                    typingDiv.innerHTML = '<div class="message-content typing-indicator">🤖 Agent is thinking...</div>';
-                    container.appendChild(typingDiv);
-                    scrollToBottom();
-                    return id;
-                }
-
-                function removeTypingIndicator(id) {
-                    const element = document.getElementById(id);
-                    if (element) {
-                        element.remove();
-                    }
-                }
-
-                function scrollToBottom() {
-                    const container = document.getElementById('messagesContainer');
-                    setTimeout(() => {
-                        container.scrollTop = container.scrollHeight;
-                    }, 50);
-                }
-
-                function escapeHtml(text) {
-                    const div = document.createElement('div');
-                    div.textContent = text;
-                    return div.innerHTML;
-                }
-
-                async function resetChat() {
-                    try {
-                        const response = await fetch('/api/reset', { method: 'POST' });
-                        const data = await response.json();
-                        
-                        // Clear messages except welcome message
-                        const container = document.getElementById('messagesContainer');
-                        container.innerHTML = `
-                            <div class="message agent-message">
-                                <div class="message-content">
-                                    🔄 Chat reset successfully!
-                                    
-                                    👋 I can help you with:
-                                    • List available exams
-                                    • Schedule exams for students  
-                                    • Get exam results
-                                    • Manage student accounts
-                                    
-                                    Try saying: "I need the list of exams" or "My student ID is [your-id] and I need results for [exam-name]"
-                                </div>
-                            </div>
-                        `;
-                        scrollToBottom();
-                    } catch (error) {
-                        addErrorMessage('Failed to reset chat: ' + error.message);
-                    }
-                }
-
-                // Test connection on page load
-                window.onload = async function() {
-                    const statusBar = document.getElementById('statusBar');
-                    try {
-                        const response = await fetch('/api/status');
-                        const data = await response.json();
-                        if (data.status === 'success') {
-                            statusBar.innerHTML = '✅ Connected | Instructor ID: ' + data.instructor_id + ' | Tools: ' + data.available_tools.length;
-                            statusBar.style.background = '#d4edda';
-                            statusBar.style.color = '#155724';
-                        } else {
-                            statusBar.innerHTML = '⚠️ Connection issue: ' + data.message;
-                            statusBar.style.background = '#f8d7da';
-                            statusBar.style.color = '#721c24';
-                        }
-                    } catch (error) {
-                        statusBar.innerHTML = '❌ Failed to connect: ' + error.message;
-                        statusBar.style.background = '#f8d7da';
-                        statusBar.style.color = '#721c24';
-                    }
-                    
-                    // Focus input
-                    document.getElementById('messageInput').focus();
-                };
-            </script>
-        </body>
-    </html>
-    """)
+    if request.headers.get("if-none-match") == INDEX_HEADERS["ETag"]:
+        return INDEX_NOT_MODIFIED
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return INDEX_GZIP_RESPONSE
+    return INDEX_RESPONSE
+
+# Browser/CDN caching for the read-only GET endpoints; status carries the
+# instructor ID, so only the browser may keep it
+STATUS_CACHE_CONTROL = "private, max-age=30"
+HEALTH_CACHE_CONTROL = "public, max-age=10"
+TOOLS_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+
+# Successful status and tool listings are reused instead of recomputed on
+# every page load; the tool set only changes on restart, so its encoded
+# listing is kept with an ETag for browsers to revalidate
+STATUS_CACHE_SECONDS = 30
+TOOLS_CACHE_SECONDS = 300
+endpoint_cache = TTLCache(ttl=STATUS_CACHE_SECONDS, maxsize=8)
 
 @app.get("/api/status", response_model=StatusResponse)
-async def status():
+async def status(response: Response):
     """Check if the LangGraph agent system is ready."""
+    cached_status = endpoint_cache.get("status")
+    if cached_status is not None:
+        response.headers["Cache-Control"] = STATUS_CACHE_CONTROL
+        return cached_status
+    
     try:
+        # Start the instructor ID lookup (the only network call) first, so the
+        # local checks below run while it is in flight
+        tool_registry = get_tool_registry()
+        instructor_task = asyncio.create_task(tool_registry.aexecute_tool("get_instructor_id"))
+        
         # Validate config
         config_valid = config.validate()
         
         # Get available tools
-        tool_registry = get_tool_registry()
         available_tools = tool_registry.list_tools()
         
-        # Test getting instructor ID
-        result = tool_registry.execute_tool("get_instructor_id")
+        result = await instructor_task
         instructor_id = None
         
         if result.get("status"):
@@ -485,13 +311,16 @@ async def status():
             instructor_id = instructor_data.get("instructor_id")
         
         if instructor_id and config_valid:
-            return StatusResponse(
+            status_response = StatusResponse(
                 status="success",
                 message="LangGraph Agent Connected Successfully",
                 instructor_id=instructor_id,
                 available_tools=available_tools,
                 config_valid=config_valid
             )
+            endpoint_cache.set("status", status_response)
+            response.headers["Cache-Control"] = STATUS_CACHE_CONTROL
+            return status_response
         else:
             error_msg = "Failed to connect"
             if not config_valid:
@@ -505,47 +334,37 @@ async def status():
             )
             
     except Exception as e:
-        print(f"Status endpoint error: {str(e)}")
+        logger.error("Status endpoint error: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Connection error: {str(e)}"
         )
 
 @app.get("/api/tools", response_model=ToolInfoResponse)
-async def list_tools():
+async def list_tools(request: Request):
     """List all available tools and their categories."""
-    try:
-        tool_registry = get_tool_registry()
-        
-        # Get tools by category
-        categories = {}
-        for category in tool_registry.categories:
-            categories[category] = tool_registry.list_tools(category)
-        
-        # Get all tools with metadata
-        tools_info = []
-        for tool_name in tool_registry.list_tools():
-            metadata = tool_registry.get_metadata(tool_name)
-            if metadata:
-                tools_info.append({
-                    "name": tool_name,
-                    "description": metadata.description,
-                    "category": metadata.category,
-                    "tags": metadata.tags,
-                    "required_parameters": metadata.required_parameters,
-                    "optional_parameters": metadata.optional_parameters
-                })
-        
-        return ToolInfoResponse(
-            tools=tools_info,
-            categories=categories
-        )
+    cached_tools = endpoint_cache.get("tools")
+    if cached_tools is None:
+        try:
+            # All tools with metadata and the category map, from one pass over the registry
+            tools_info, categories = get_tool_registry().snapshot()
+            body = orjson.dumps({"tools": tools_info, "categories": categories})
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error listing tools: {str(e)}"
+            )
         
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error listing tools: {str(e)}"
-        )
+        cached_tools = (body, {
+            "Cache-Control": TOOLS_CACHE_CONTROL,
+            "ETag": f'W/"{hashlib.sha1(body).hexdigest()}"'
+        })
+        endpoint_cache.set("tools", cached_tools, TOOLS_CACHE_SECONDS)
+    
+    body, headers = cached_tools
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
 
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(chat_msg: ChatMessage, request: Request, response: Response):
@@ -559,19 +378,14 @@ async def chat(chat_msg: ChatMessage, request: Request, response: Response):
             )
         
         # Get session ID for this user
-        session_id = get_session_id(request)
+        session_id, session_cookie = await get_session_id(request.cookies)
         
         # Set session ID cookie for future requests
-        response.set_cookie(
-            key="session_id", 
-            value=session_id, 
-            httponly=True, 
-            samesite="lax",
-            max_age=86400  # 24 hours
-        )
+        set_session_cookie(response, session_cookie)
         
-        # Run the LangGraph agent
-        agent_response = run_langgraph_agent(user_message, session_id)
+        # Await the agent so other requests keep being served meanwhile;
+        # LangGraph runs the blocking LLM and API calls in worker threads
+        agent_response = await run_langgraph_agent_async(user_message, session_id)
         
         return ChatResponse(
             status="success",
@@ -580,19 +394,75 @@ async def chat(chat_msg: ChatMessage, request: Request, response: Response):
         )
         
     except Exception as e:
-        print(f"Error in chat endpoint: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Chat endpoint error")
         raise HTTPException(
             status_code=500,
             detail=f"Agent error: {str(e)}"
         )
 
+@app.post("/api/chat/stream")
+async def chat_stream(chat_msg: ChatMessage, request: Request):
+    """Stream the LangGraph agent's progress and reply as server-sent events."""
+    user_message = chat_msg.message.strip()
+    if not user_message:
+        raise HTTPException(
+            status_code=400,
+            detail="Empty message"
+        )
+    
+    session_id, session_cookie = await get_session_id(request.cookies)
+    
+    async def event_stream():
+        async for event in astream_langgraph_agent(user_message, session_id):
+            yield b"data: " + orjson.dumps(event) + b"\n\n"
+    
+    # Disable proxy buffering so each event reaches the browser immediately
+    response = StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+    set_session_cookie(response, session_cookie)
+    return response
+
+@app.websocket("/ws/chat")
+async def chat_socket(websocket: WebSocket):
+    """Stream the LangGraph agent's progress and replies over one persistent WebSocket."""
+    # The handshake carries the session cookie like any same-origin request,
+    # and (re)issues it like any other response
+    session_id, session_cookie = await get_session_id(websocket.cookies)
+    cookie_response = Response()
+    set_session_cookie(cookie_response, session_cookie)
+    await websocket.accept(headers=[header for header in cookie_response.raw_headers if header[0] == b"set-cookie"])
+    last_touched = time.monotonic()
+    
+    try:
+        while True:
+            frame = await websocket.receive_text()
+            try:
+                user_message = orjson.loads(frame)["message"].strip()
+            except (orjson.JSONDecodeError, KeyError, TypeError, AttributeError):
+                user_message = ""
+            
+            if not user_message:
+                await websocket.send_text('{"type":"error","text":"Empty message"}')
+            else:
+                # Long-lived sockets keep their session alive at the cookie revalidation pace
+                if time.monotonic() - last_touched >= SESSION_REVALIDATE_SECONDS:
+                    await session_store.touch(session_id)
+                    last_touched = time.monotonic()
+                async for event in astream_langgraph_agent(user_message, session_id):
+                    await websocket.send_text(orjson.dumps(event).decode())
+            # Tells the page the turn is over and it can send again
+            await websocket.send_text('{"type":"done"}')
+    except WebSocketDisconnect:
+        pass
+
 @app.post("/api/reset", response_model=ResetResponse)
 async def reset_conversation_endpoint(request: Request):
     """Reset the conversation state."""
     try:
-        session_id = get_session_id(request)
+        session_id, _ = await get_session_id(request.cookies)
         reset_langgraph_session(session_id)
         return ResetResponse(
             status="success",
@@ -605,14 +475,24 @@ async def reset_conversation_endpoint(request: Request):
         )
 
 @app.get("/api/health", response_model=HealthResponse)
-async def health():
+async def health(response: Response):
     """Health check endpoint."""
+    response.headers["Cache-Control"] = HEALTH_CACHE_CONTROL
     return HealthResponse(
         status="healthy",
         service="ExamBuilder LangGraph Agent API",
         version="2.0.0"
     )
 
+def server_workers(config) -> int:
+    """Number of server worker processes, refusing several that can't share sessions."""
+    if config.DEBUG:
+        return 1  # Auto-reload runs a single process
+    # Each worker would keep its own in-memory sessions and conversation history
+    if config.WEB_CONCURRENCY > 1 and not config.REDIS_URL:
+        raise RuntimeError("REDIS_URL must be set when WEB_CONCURRENCY > 1")
+    return config.WEB_CONCURRENCY
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -623,14 +503,20 @@ if __name__ == "__main__":
     print("   - GET  /api/status  - Check connection")
     print("   - GET  /api/tools   - List available tools")
     print("   - POST /api/chat    - Send message")
+    print("   - POST /api/chat/stream - Send message, streaming the reply")
+    print("   - WS   /ws/chat     - Chat over a persistent WebSocket")
     print("   - POST /api/reset   - Reset conversation")
     print("   - GET  /api/health  - Health check")
     print("=" * 50)
     
+    # uvicorn picks uvloop and httptools (from uvicorn[standard]) over the
+    # pure-Python loop and parser; auto-reload only watches files in debug mode
     uvicorn.run(
         "fastapi_app_langgraph:app",
         host="0.0.0.0",
         port=8002,
-        reload=True,
+        reload=config.DEBUG,
+        uds=config.UNIX_SOCKET or None,
+        workers=server_workers(config),
         log_level="info"
     )
\ No newline at end of file
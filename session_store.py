@@ -0,0 +1,98 @@
+"""
+Session Storage for ExamBuilder Multi-Agent System
+Pluggable session backends: in-memory by default, Redis when REDIS_URL is set
+"""
+
+from typing import Callable, Optional
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+from cache import TTLCache
+from config import Config
+
+class SessionStore:
+    """Interface for chat session storage"""
+
+    async def touch(self, session_id: str):
+        """Create the session, or extend its expiry if it already exists"""
+        raise NotImplementedError
+
+    async def delete(self, session_id: str):
+        """Remove a session"""
+        raise NotImplementedError
+
+    async def close(self):
+        """Release any connections held by the store"""
+
+class MemorySessionStore(SessionStore):
+    """Process-local sessions in a bounded TTL + LRU cache"""
+
+    def __init__(self, ttl: float, maxsize: int, on_expire: Optional[Callable[[str], None]] = None):
+        self.sessions = TTLCache(
+            ttl=ttl,
+            maxsize=maxsize,
+            on_evict=(lambda session_id, _: on_expire(session_id)) if on_expire else None
+        )
+
+    async def touch(self, session_id: str):
+        # Re-storing the session on every access keeps active sessions alive
+        session_data = self.sessions.get(session_id) or {"created": True}
+        self.sessions.set(session_id, session_data)
+
+    async def delete(self, session_id: str):
+        self.sessions.pop(session_id)
+
+class RedisSessionStore(SessionStore):
+    """Sessions shared by every worker through Redis key expiry"""
+
+    KEY_PREFIX = "session:"
+
+    def __init__(self, client, ttl: int):
+        self.client = client
+        self.ttl = ttl
+
+    async def touch(self, session_id: str):
+        # SET with EX both creates the key and slides its expiry
+        await self.client.set(f"{self.KEY_PREFIX}{session_id}", "1", ex=self.ttl)
+
+    async def delete(self, session_id: str):
+        await self.client.delete(f"{self.KEY_PREFIX}{session_id}")
+
+    async def close(self):
+        await self.client.aclose()
+
+def create_session_store(config: Config, on_expire: Optional[Callable[[str], None]] = None) -> SessionStore:
+    """Create the session store selected by the configuration
+
+    on_expire is called with the ID of each in-memory session that expires or is
+    evicted; Redis sessions expire on the server instead.
+    """
+    ttl = config.SESSION_TIMEOUT_HOURS * 3600
+
+    if config.REDIS_URL:
+        try:
+            import redis.asyncio as aioredis
+        except ImportError:
+            print("⚠️  REDIS_URL is set but the redis package is not installed; using in-memory sessions")
+        else:
+            print("🗄️  Using Redis session store")
+            return RedisSessionStore(aioredis.from_url(config.REDIS_URL, decode_responses=True), ttl)
+
+    return MemorySessionStore(ttl=ttl, maxsize=config.MAX_SESSIONS, on_expire=on_expire)
+
+def create_checkpointer(config: Config) -> Optional[BaseCheckpointSaver]:
+    """Create a Redis checkpointer for conversation history, or None to keep it in memory"""
+    if not config.REDIS_URL:
+        return None
+    
+    try:
+        from langgraph.checkpoint.redis.aio import AsyncRedisSaver
+    except ImportError:
+        print("⚠️  REDIS_URL is set but langgraph-checkpoint-redis is not installed; using in-memory conversations")
+        return None
+    
+    print("🗄️  Using Redis conversation checkpointer")
+    # Checkpoints expire with the session; reading one extends its expiry
+    return AsyncRedisSaver(
+        redis_url=config.REDIS_URL,
+        ttl={"default_ttl": config.SESSION_TIMEOUT_HOURS * 60, "refresh_on_read": True}
+    )
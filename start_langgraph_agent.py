@@ -4,7 +4,7 @@ Simple startup script for ExamBuilder LangGraph Agent
 """
 
 import uvicorn
-from fastapi_app_langgraph import app
+from fastapi_app_langgraph import app, config, server_workers
 
 if __name__ == "__main__":
     print("🎓 Starting ExamBuilder LangGraph Agent...")
@@ -12,9 +12,12 @@ if __name__ == "__main__":
     print("📚 API Docs: http://localhost:8004/docs")
     print("=" * 50)
     
+    # Auto-reload only in debug mode; production runs WEB_CONCURRENCY workers
     uvicorn.run(
         "fastapi_app_langgraph:app",
         host="0.0.0.0",
         port=8004,
-        reload=True
+        reload=config.DEBUG,
+        uds=config.UNIX_SOCKET or None,
+        workers=server_workers(config)
     )
\ No newline at end of file
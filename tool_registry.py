@@ -3,10 +3,13 @@ Dynamic Tool Registry for ExamBuilder Multi-Agent System
 Automatically discovers and registers tools without hard-coding
 """
 
+import asyncio
+import functools
 import inspect
 import importlib
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, List, Optional, Any, Callable, Tuple
 from dataclasses import dataclass
+from types import MappingProxyType
 from enum import Enum
 import json
 from langsmith import trace
@@ -32,13 +35,27 @@ class ToolCategory(Enum):
     RESULTS = "results"
     UTILITY = "utility"
 
+# Tools likely to serve each intent, suggested by get_tool_suggestions
+INTENT_TOOLS = MappingProxyType({
+    "list_exams": ("list_exams",),
+    "get_exam": ("get_exam",),
+    "list_students": ("list_students",),
+    "get_student": ("get_student", "search_student_by_student_id"),
+    "create_student": ("create_student",),
+    "schedule_exam": ("schedule_exam",),
+    "get_results": ("get_exam_attempt", "get_student_exam_statistics"),
+    "authentication": ("get_instructor_id",)
+})
+
 class DynamicToolRegistry:
     """Dynamic tool registry with automatic discovery"""
     
     def __init__(self):
         self.tools: Dict[str, Callable] = {}
+        self.async_tools: Dict[str, Callable] = {}
         self.metadata: Dict[str, ToolMetadata] = {}
         self.categories: Dict[str, List[str]] = {}
+        self._snapshot: Optional[Tuple[List[Dict[str, Any]], Dict[str, List[str]]]] = None
         
         # Auto-discover tools from exambuilder_tools module
         self._discover_tools()
@@ -53,6 +70,10 @@ class DynamicToolRegistry:
                 if inspect.isfunction(obj) and not name.startswith('_'):
                     # Register the tool
                     self.register_tool(name, obj)
+            
+            # Native async versions of plain endpoint reads
+            for name in exambuilder_tools.ASYNC_ENDPOINT_TOOLS:
+                self.async_tools[name] = functools.partial(exambuilder_tools._acall_endpoint, name)
                     
         except ImportError as e:
             print(f"⚠️  Could not import exambuilder_tools: {e}")
@@ -72,6 +93,7 @@ class DynamicToolRegistry:
         if category not in self.categories:
             self.categories[category] = []
         self.categories[category].append(name)
+        self._snapshot = None
         
         print(f"🔧 Registered tool: {name} ({category})")
     
@@ -171,6 +193,25 @@ class DynamicToolRegistry:
             return self.categories.get(category, [])
         return list(self.tools.keys())
     
+    def snapshot(self) -> Tuple[List[Dict[str, Any]], Dict[str, List[str]]]:
+        """Get every tool's public info and the category map, built in one pass and reused until a tool is registered"""
+        if self._snapshot is None:
+            tools_info = []
+            categories: Dict[str, List[str]] = {}
+            for name, metadata in self.metadata.items():
+                tools_info.append({
+                    "name": name,
+                    "description": metadata.description,
+                    "category": metadata.category,
+                    "tags": metadata.tags,
+                    "required_parameters": metadata.required_parameters,
+                    "optional_parameters": metadata.optional_parameters
+                })
+                categories.setdefault(metadata.category, []).append(name)
+            self._snapshot = (tools_info, categories)
+        
+        return self._snapshot
+    
     def get_tools_by_category(self, category: str) -> Dict[str, Callable]:
         """Get all tools in a category"""
         tool_names = self.categories.get(category, [])
@@ -208,19 +249,11 @@ class DynamicToolRegistry:
         try:
             with trace(f"tool_execution_{name}"):
                 tool = self.tools[name]
-                metadata = self.metadata[name]
                 
                 # Validate required parameters
-                missing_params = []
-                for param in metadata.required_parameters:
-                    if param not in kwargs:
-                        missing_params.append(param)
-                
-                if missing_params:
-                    return {
-                        "status": False, 
-                        "error": f"Missing required parameters: {', '.join(missing_params)}"
-                    }
+                missing_error = self._missing_parameters_error(name, kwargs)
+                if missing_error:
+                    return missing_error
                 
                 # Execute the tool
                 result = tool(**kwargs)
@@ -229,25 +262,42 @@ class DynamicToolRegistry:
         except Exception as e:
             return {"status": False, "error": f"Tool execution error: {str(e)}"}
     
-    def get_tool_suggestions(self, intent: str, entities: Dict[str, Any]) -> List[str]:
-        """Get tool suggestions based on intent and entities"""
-        suggestions = []
+    async def aexecute_tool(self, name: str, **kwargs) -> Dict[str, Any]:
+        """Execute a tool without blocking the event loop
         
-        # Map intents to likely tools
-        intent_mapping = {
-            "list_exams": ["list_exams"],
-            "get_exam": ["get_exam"],
-            "list_students": ["list_students"],
-            "get_student": ["get_student", "search_student_by_student_id"],
-            "create_student": ["create_student"],
-            "schedule_exam": ["schedule_exam"],
-            "get_results": ["get_exam_attempt", "get_student_exam_statistics"],
-            "authentication": ["get_instructor_id"]
-        }
+        Tools with a native async version are awaited; the others run in a
+        worker thread.
+        """
+        async_tool = self.async_tools.get(name)
+        if async_tool is None:
+            return await asyncio.to_thread(self.execute_tool, name, **kwargs)
         
+        try:
+            async with trace(f"tool_execution_{name}"):
+                missing_error = self._missing_parameters_error(name, kwargs)
+                if missing_error:
+                    return missing_error
+                
+                result = await async_tool(**kwargs)
+                return {"status": True, "data": result}
+            
+        except Exception as e:
+            return {"status": False, "error": f"Tool execution error: {str(e)}"}
+    
+    def _missing_parameters_error(self, name: str, kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Get the error result for a call without all required parameters, if any are missing"""
+        missing_params = [param for param in self.metadata[name].required_parameters if param not in kwargs]
+        if missing_params:
+            return {
+                "status": False, 
+                "error": f"Missing required parameters: {', '.join(missing_params)}"
+            }
+        return None
+    
+    def get_tool_suggestions(self, intent: str, entities: Dict[str, Any]) -> List[str]:
+        """Get tool suggestions based on intent and entities"""
         # Get suggestions based on intent
-        if intent in intent_mapping:
-            suggestions.extend(intent_mapping[intent])
+        suggestions = list(INTENT_TOOLS.get(intent, ()))
         
         # Add tools based on entities
         if "student_id" in entities: